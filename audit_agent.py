@@ -14,15 +14,27 @@ Structure: audit-logs/YYYY-MM-DD/policy_number/AgentName_timestamp.json
 
 import os
 import json
+import asyncio
+import atexit
+import threading
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 from azure.storage.blob import BlobServiceClient
 import traceback
 
+from json_utils import dumps_body
+
 # Load environment variables
 load_dotenv()
 
+# Blob name prefix used by BufferedAuditWriter for multi-record batches
+BATCH_BLOB_PREFIX = "AuditBatch_"
+
+# Local JSON-lines file for records BufferedAuditWriter could not upload by exit
+AUDIT_FALLBACK_PATH = "audit_fallback.jsonl"
+
 
 class AuditAgent:
     """
@@ -322,6 +334,81 @@ class AuditAgent:
             metadata=metadata
         )
     
+    def _build_audit_log(
+        self,
+        agent_name: str,
+        policy_number: str,
+        action: str,
+        inputs: Dict[str, Any],
+        outputs: Dict[str, Any],
+        decision: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, str]:
+        """
+        Build the blob name and serialized JSON for an audit log entry.
+        
+        Args:
+            agent_name: Name of the agent (e.g., "DocumentAgent")
+            policy_number: Policy number for the claim
+            action: Action performed
+            inputs: Input data
+            outputs: Output data
+            decision: Decision made
+            metadata: Additional metadata
+        
+        Returns:
+            tuple: (blob_name, json_data)
+        """
+        record, date_folder, timestamp_str = self._build_audit_record(
+            agent_name, policy_number, action, inputs, outputs, decision, metadata
+        )
+        
+        # Create blob path following structure: date/policy_number/AgentName_timestamp.json
+        blob_name = f"{date_folder}/{policy_number}/{agent_name}_{timestamp_str}.json"
+        json_data = json.dumps(record, indent=2, default=str)
+        return blob_name, json_data
+    
+    def _build_audit_record(
+        self,
+        agent_name: str,
+        policy_number: str,
+        action: str,
+        inputs: Dict[str, Any],
+        outputs: Dict[str, Any],
+        decision: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], str, str]:
+        """
+        Build the audit log structure for an entry.
+        
+        Returns:
+            tuple: (audit_log, date_folder, timestamp_str)
+        """
+        # Generate timestamp
+        timestamp = datetime.now()
+        timestamp_iso = timestamp.isoformat()
+        timestamp_str = timestamp.strftime("%Y%m%dT%H%M%S")
+        date_folder = timestamp.strftime("%Y-%m-%d")
+        
+        # Create audit log structure
+        audit_log = {
+            "agent_name": agent_name,
+            "timestamp": timestamp_iso,
+            "policy_number": policy_number,
+            "action": action,
+            "inputs": inputs,
+            "outputs": outputs,
+            "decision": decision,
+            "metadata": metadata or {},
+            "responsible_ai": {
+                "transparency": "All decisions logged for audit trail",
+                "accountability": f"Agent: {agent_name}",
+                "traceability": f"Timestamp: {timestamp_iso}",
+                "compliance": "Full input/output capture for regulatory review"
+            }
+        }
+        return audit_log, date_folder, timestamp_str
+    
     def _log_agent_action(
         self,
         agent_name: str,
@@ -348,40 +435,15 @@ class AuditAgent:
             bool: True if logged successfully, False otherwise
         """
         try:
-            # Generate timestamp
-            timestamp = datetime.now()
-            timestamp_iso = timestamp.isoformat()
-            timestamp_str = timestamp.strftime("%Y%m%dT%H%M%S")
-            date_folder = timestamp.strftime("%Y-%m-%d")
-            
-            # Create audit log structure
-            audit_log = {
-                "agent_name": agent_name,
-                "timestamp": timestamp_iso,
-                "policy_number": policy_number,
-                "action": action,
-                "inputs": inputs,
-                "outputs": outputs,
-                "decision": decision,
-                "metadata": metadata or {},
-                "responsible_ai": {
-                    "transparency": "All decisions logged for audit trail",
-                    "accountability": f"Agent: {agent_name}",
-                    "traceability": f"Timestamp: {timestamp_iso}",
-                    "compliance": "Full input/output capture for regulatory review"
-                }
-            }
-            
-            # Create blob path following structure: date/policy_number/AgentName_timestamp.json
-            blob_name = f"{date_folder}/{policy_number}/{agent_name}_{timestamp_str}.json"
+            blob_name, json_data = self._build_audit_log(
+                agent_name, policy_number, action, inputs, outputs, decision, metadata
+            )
             
             # Upload to Azure Blob Storage
             blob_client = self.blob_service_client.get_blob_client(
                 container=self.container_name,
                 blob=blob_name
             )
-            
-            json_data = json.dumps(audit_log, indent=2, default=str)
             blob_client.upload_blob(json_data, overwrite=True)
             
             print(f"✅ Audit log uploaded: {blob_name}")
@@ -392,6 +454,33 @@ class AuditAgent:
             traceback.print_exc()
             return False
     
+    async def log_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """
+        Log several agent actions with their blob uploads running concurrently.
+        
+        Each entry is (helper_name, kwargs) naming one of the typed log_*_action
+        helpers, e.g. ("log_fraud_detection_action", {"policy_number": ..., ...}),
+        so decision and metadata are built the same way as a direct call.
+        
+        Args:
+            entries: (helper_name, kwargs) pairs to upload
+        
+        Returns:
+            list: One bool per entry, True if logged successfully
+        
+        Raises:
+            ValueError: If helper_name is not a log_*_action helper
+        """
+        calls = []
+        for helper_name, kwargs in entries:
+            if not (helper_name.startswith("log_") and helper_name.endswith("_action")):
+                raise ValueError(f"Unknown audit helper: {helper_name}")
+            calls.append((getattr(self, helper_name), kwargs))
+        
+        return list(await asyncio.gather(
+            *(asyncio.to_thread(helper, **kwargs) for helper, kwargs in calls)
+        ))
+    
     def get_audit_trail(
         self,
         policy_number: str,
@@ -424,13 +513,23 @@ class AuditAgent:
             audit_logs = []
             for blob in blobs:
                 # Filter by policy number and optionally by agent name
-                if policy_number in blob.name:
-                    if agent_name is None or agent_name in blob.name:
-                        # Download and parse the blob
-                        blob_client = container_client.get_blob_client(blob.name)
-                        blob_data = blob_client.download_blob().readall()
-                        audit_log = json.loads(blob_data)
-                        audit_logs.append(audit_log)
+                if policy_number not in blob.name:
+                    continue
+                is_batch = BATCH_BLOB_PREFIX in blob.name
+                if agent_name is not None and not is_batch and agent_name not in blob.name:
+                    continue
+                
+                # Download and parse the blob
+                blob_client = container_client.get_blob_client(blob.name)
+                blob_data = blob_client.download_blob().readall()
+                audit_log = json.loads(blob_data)
+                
+                # Batch blobs from BufferedAuditWriter hold a list of records
+                records = audit_log if isinstance(audit_log, list) else [audit_log]
+                audit_logs.extend(
+                    r for r in records
+                    if agent_name is None or r.get("agent_name") == agent_name
+                )
             
             return sorted(audit_logs, key=lambda x: x.get('timestamp', ''))
             
@@ -505,6 +604,148 @@ def get_audit_agent() -> AuditAgent:
     return _audit_agent_instance
 
 
+class BufferedAuditWriter:
+    """
+    Buffers audit log records in memory and uploads them in batches.
+    
+    Records are grouped by (date, policy_number) and each group is written
+    as one JSON-array blob: date/policy_number/AuditBatch_timestamp.json.
+    A flush happens when max_records are pending, every flush_interval
+    seconds from a background thread, and at interpreter exit. Groups whose
+    upload fails go back into the buffer for the next flush; whatever still
+    cannot be uploaded at close() is appended to AUDIT_FALLBACK_PATH.
+    """
+    
+    def __init__(
+        self,
+        audit_agent: Optional[AuditAgent] = None,
+        flush_interval: float = 5.0,
+        max_records: int = 50
+    ):
+        """
+        Initialize the writer.
+        
+        Args:
+            audit_agent: Agent whose blob client and record format are used
+            flush_interval: Seconds between background flushes
+            max_records: Pending record count that triggers an immediate flush
+        """
+        self.audit_agent = audit_agent or get_audit_agent()
+        self.flush_interval = flush_interval
+        self.max_records = max_records
+        self._buffer: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        
+        self._flusher = threading.Thread(target=self._flush_periodically, name="audit-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+    
+    def log(
+        self,
+        agent_name: str,
+        policy_number: str,
+        action: str,
+        inputs: Dict[str, Any],
+        outputs: Dict[str, Any],
+        decision: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Queue one audit record (same arguments as AuditAgent._log_agent_action)."""
+        record, date_folder, _ = self.audit_agent._build_audit_record(
+            agent_name, policy_number, action, inputs, outputs, decision, metadata
+        )
+        with self._lock:
+            self._buffer[(date_folder, policy_number)].append(record)
+            self._pending += 1
+            full = self._pending >= self.max_records
+        if full:
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Upload every buffered record, one blob per (date, policy_number).
+        
+        Returns:
+            int: Number of records uploaded
+        """
+        with self._lock:
+            groups, self._buffer = self._buffer, defaultdict(deque)
+            self._pending = 0
+        
+        uploaded = 0
+        for (date_folder, policy_number), records in groups.items():
+            timestamp_str = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            blob_name = f"{date_folder}/{policy_number}/{BATCH_BLOB_PREFIX}{timestamp_str}.json"
+            try:
+                blob_client = self.audit_agent.blob_service_client.get_blob_client(
+                    container=self.audit_agent.container_name,
+                    blob=blob_name
+                )
+                blob_client.upload_blob(_dumps_records(list(records)), overwrite=False)
+                uploaded += len(records)
+                print(f"✅ Audit batch uploaded: {blob_name} ({len(records)} records)")
+            except Exception as e:
+                print(f"❌ Failed to upload audit batch {blob_name}: {str(e)}")
+                traceback.print_exc()
+                # Keep the records (ahead of anything logged meanwhile) for the next flush
+                with self._lock:
+                    self._buffer[(date_folder, policy_number)].extendleft(reversed(records))
+                    self._pending += len(records)
+        return uploaded
+    
+    def close(self) -> int:
+        """
+        Stop the background flusher and upload anything still buffered.
+        
+        Records that still fail to upload are appended to AUDIT_FALLBACK_PATH.
+        
+        Returns:
+            int: Number of records uploaded
+        """
+        self._stop.set()
+        # Never let the final flush race a periodic one
+        if self._flusher.is_alive() and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        uploaded = self.flush()
+        
+        with self._lock:
+            groups, self._buffer = self._buffer, defaultdict(deque)
+            self._pending = 0
+        if groups:
+            with open(AUDIT_FALLBACK_PATH, "ab") as f:
+                for records in groups.values():
+                    for record in records:
+                        f.write(_dumps_records(record) + b"\n")
+            print(f"⚠️ Wrote {sum(len(r) for r in groups.values())} unsent audit records to {AUDIT_FALLBACK_PATH}")
+        return uploaded
+    
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+def _dumps_records(records: List[Dict[str, Any]]) -> bytes:
+    """Serialize a batch of audit records."""
+    return dumps_body(records, default=str)
+
+
+_buffered_writer_instance = None
+
+def get_buffered_audit_writer() -> BufferedAuditWriter:
+    """
+    Get singleton instance of BufferedAuditWriter.
+    
+    Returns:
+        BufferedAuditWriter: Singleton buffered writer around get_audit_agent()
+    """
+    global _buffered_writer_instance
+    if _buffered_writer_instance is None:
+        _buffered_writer_instance = BufferedAuditWriter()
+    return _buffered_writer_instance
+
+
 if __name__ == "__main__":
     """Test the Audit Agent with sample data from all agents."""
     print("=" * 70)
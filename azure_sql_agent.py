@@ -5,9 +5,18 @@ Handles policy validation and data retrieval from Azure SQL Database
 
 import pyodbc
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+# Policies whose policy_data rows are kept in memory per agent
+POLICY_CACHE_SIZE = 1024
+# Seconds a cached row is trusted; bounds how long another process's
+# UPDATE (e.g. update_policy.py) can go unseen
+POLICY_CACHE_TTL = 60
+
 
 class AzureSQLAgent:
     """Agent for interacting with Azure SQL Database for policy validation"""
@@ -19,9 +28,23 @@ class AzureSQLAgent:
         self.username = os.getenv('AZURE_SQL_USERNAME')
         self.password = os.getenv('AZURE_SQL_PASSWORD')
         self.connection = None
+        # pyodbc connections must not be used by two threads at once
+        # (threadsafety 1), and lookups arrive from to_thread workers
+        self._connection_lock = threading.RLock()
+        # LRU of policy_number -> (fetched_at, row); shared by to_thread workers
+        self._policy_rows = OrderedDict()
+        self._policy_rows_lock = threading.Lock()
         
     def connect(self) -> bool:
         """Establish connection to Azure SQL Database"""
+        with self._connection_lock:
+            # Another worker may have connected while this one waited
+            if self.connection:
+                return True
+            return self._open_connection()
+    
+    def _open_connection(self) -> bool:
+        """Open the pyodbc connection (caller holds _connection_lock)"""
         try:
             connection_string = (
                 f"DRIVER={{SQL Server}};"
@@ -41,6 +64,17 @@ class AzureSQLAgent:
             print(f"❌ Error connecting to Azure SQL Database: {e}")
             return False
     
+    def warm_up(self) -> bool:
+        """Open the connection and run a throwaway query so later lookups hit a warm path"""
+        try:
+            if not self.connection and not self.connect():
+                return False
+            self._query_one("SELECT 1")
+            return True
+        except Exception as e:
+            print(f"⚠️ Azure SQL warm-up failed: {e}")
+            return False
+    
     def validate_policy(self, policy_number: str) -> Dict[str, Any]:
         """
         Validate if policy exists in Azure SQL Database
@@ -60,12 +94,9 @@ class AzureSQLAgent:
                         'policy_exists': False
                     }
             
-            cursor = self.connection.cursor()
-            
             # Check if policy exists
             query = "SELECT policy_number FROM policy_data WHERE policy_number = ?"
-            cursor.execute(query, (policy_number,))
-            result = cursor.fetchone()
+            _, result = self._query_one(query, (policy_number,))
             
             if result:
                 print(f"✅ Policy {policy_number} found in Azure SQL Database")
@@ -109,44 +140,15 @@ class AzureSQLAgent:
                         'error': 'Failed to connect to Azure SQL Database'
                     }
             
-            cursor = self.connection.cursor()
-            
             # Get all policy details
-            query = "SELECT * FROM policy_data WHERE policy_number = ?"
-            cursor.execute(query, (policy_number,))
-            
-            # Get column names
-            columns = [column[0] for column in cursor.description]
-            
-            # Fetch data
-            row = cursor.fetchone()
+            policy_data = self._fetch_policy_row(policy_number)
             
-            if row:
-                # Convert row to dictionary
-                policy_data = dict(zip(columns, row))
-                
+            if policy_data:
                 print(f"✅ Retrieved policy details for {policy_number}")
                 
                 return {
                     'success': True,
-                    'policy_info': {
-                        'policy_number': policy_data.get('policy_number'),
-                        'policyholder_name': policy_data.get('policyholder_Name'),
-                        'policyholder_id': policy_data.get('policyholder_id'),
-                        'claim_history_count': policy_data.get('claim_history_count'),
-                        'past_claims_amount': policy_data.get('past_claims_amount'),
-                        'policy_status': policy_data.get('policy_status'),
-                        'policy_limit': policy_data.get('policy_limit')
-                    },
-                    'validation': {
-                        'is_valid': policy_data.get('policy_status', '').lower() == 'active',
-                        'details': {
-                            'policy_status': policy_data.get('policy_status'),
-                            'policy_limit': policy_data.get('policy_limit'),
-                            'past_claims_amount': policy_data.get('past_claims_amount'),
-                            'claim_history_count': policy_data.get('claim_history_count')
-                        }
-                    }
+                    **self._format_policy_details(policy_data)
                 }
             else:
                 return {
@@ -161,19 +163,172 @@ class AzureSQLAgent:
                 'error': str(e)
             }
     
+    def _fetch_policy_row(self, policy_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the policy_data row for a policy as a dict, or None if absent
+        
+        Rows that exist are memoized for POLICY_CACHE_TTL seconds (LRU,
+        POLICY_CACHE_SIZE entries); misses are not, so newly uploaded
+        policies are found.
+        """
+        now = time.monotonic()
+        with self._policy_rows_lock:
+            cached = self._policy_rows.get(policy_number)
+            if cached is not None:
+                if now - cached[0] < POLICY_CACHE_TTL:
+                    self._policy_rows.move_to_end(policy_number)
+                    return cached[1]
+                del self._policy_rows[policy_number]
+        
+        columns, fetched = self._query_one("SELECT * FROM policy_data WHERE policy_number = ?", (policy_number,))
+        if not fetched:
+            return None
+        
+        row = dict(zip(columns, fetched))
+        with self._policy_rows_lock:
+            self._policy_rows[policy_number] = (now, row)
+            self._policy_rows.move_to_end(policy_number)
+            if len(self._policy_rows) > POLICY_CACHE_SIZE:
+                self._policy_rows.popitem(last=False)
+        return row
+    
+    def _query_one(self, query: str, params: tuple = ()) -> Tuple[List[str], Any]:
+        """
+        Run a query on the shared connection and return (column names, first row)
+        
+        The connection is used by one thread at a time and the cursor is
+        always closed.
+        """
+        with self._connection_lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                return columns, cursor.fetchone()
+            finally:
+                cursor.close()
+    
+    def invalidate_policy(self, policy_number: Optional[str] = None) -> None:
+        """
+        Drop a cached policy_data row (or all of them) after the policy changed
+        
+        Args:
+            policy_number: Policy to forget; None clears the whole cache
+        """
+        with self._policy_rows_lock:
+            if policy_number is None:
+                self._policy_rows.clear()
+            else:
+                self._policy_rows.pop(policy_number, None)
+    
+    @staticmethod
+    def _format_policy_details(policy_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a policy_data row into the policy_info / validation sections"""
+        return {
+            'policy_info': {
+                'policy_number': policy_data.get('policy_number'),
+                'policyholder_name': policy_data.get('policyholder_Name'),
+                'policyholder_id': policy_data.get('policyholder_id'),
+                'claim_history_count': policy_data.get('claim_history_count'),
+                'past_claims_amount': policy_data.get('past_claims_amount'),
+                'policy_status': policy_data.get('policy_status'),
+                'policy_limit': policy_data.get('policy_limit')
+            },
+            'validation': {
+                'is_valid': policy_data.get('policy_status', '').lower() == 'active',
+                'details': {
+                    'policy_status': policy_data.get('policy_status'),
+                    'policy_limit': policy_data.get('policy_limit'),
+                    'past_claims_amount': policy_data.get('past_claims_amount'),
+                    'claim_history_count': policy_data.get('claim_history_count')
+                }
+            }
+        }
+    
+    def validate_and_get_details(self, policy_number: str) -> Dict[str, Any]:
+        """
+        Validate a policy and fetch its details in a single round-trip
+        
+        Combines validate_policy() and get_policy_details() for callers
+        that always need both.
+        
+        Args:
+            policy_number: Policy number to look up
+            
+        Returns:
+            Dictionary with validation results plus policy_info / validation
+            sections when the policy exists
+        """
+        try:
+            if not self.connection:
+                if not self.connect():
+                    return {
+                        'success': False,
+                        'error': 'Failed to connect to Azure SQL Database',
+                        'policy_exists': False
+                    }
+            
+            policy_data = self._fetch_policy_row(policy_number)
+            
+            if policy_data:
+                print(f"✅ Policy {policy_number} found in Azure SQL Database")
+                return {
+                    'success': True,
+                    'policy_exists': True,
+                    'policy_number': policy_number,
+                    **self._format_policy_details(policy_data)
+                }
+            else:
+                print(f"❌ Policy {policy_number} not found in Azure SQL Database")
+                return {
+                    'success': True,
+                    'policy_exists': False,
+                    'policy_number': policy_number,
+                    'error': f'Policy {policy_number} not found in database'
+                }
+                
+        except Exception as e:
+            print(f"❌ Error validating policy: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'policy_exists': False
+            }
+    
     def close(self):
         """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            print("✅ Azure SQL Database connection closed")
+        with self._connection_lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+                print("✅ Azure SQL Database connection closed")
 
 
 # Singleton instance
 _azure_sql_agent = None
 
-def get_azure_sql_agent() -> AzureSQLAgent:
-    """Get or create Azure SQL Agent instance"""
+def get_azure_sql_agent(warm_up: bool = False) -> AzureSQLAgent:
+    """
+    Get or create Azure SQL Agent instance
+    
+    Args:
+        warm_up: Open the connection and run a probe query now (only when the
+            instance is first created), instead of on the first lookup
+    """
     global _azure_sql_agent
     if _azure_sql_agent is None:
         _azure_sql_agent = AzureSQLAgent()
+        if warm_up:
+            _azure_sql_agent.warm_up()
     return _azure_sql_agent
+
+
+def invalidate_cached_policy(policy_number: Optional[str] = None) -> None:
+    """
+    Forget a policy row cached by this process's agent, if one exists
+    
+    Update scripts call this after changing policy_data; other processes
+    pick the change up once their POLICY_CACHE_TTL expires.
+    """
+    if _azure_sql_agent is not None:
+        _azure_sql_agent.invalidate_policy(policy_number)
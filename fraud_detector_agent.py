@@ -5,20 +5,210 @@ Uses Azure ML deployed model to detect potential fraud in insurance claims
 
 import os
 import json
+import logging
+import queue
+import threading
+import time
+import numpy as np
 import requests
+from concurrent.futures import Future
 from dotenv import load_dotenv
+from http_session import create_session
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Keep-alive session shared by every agent instance so the TLS handshake to
+# the Azure ML endpoint is paid once per process; transient failures are retried
+SESSION = create_session(pool_connections=4, pool_maxsize=16, retries=2, backoff_factor=0.2)
+
+# Representative claim posted once at start-up so the endpoint's model
+# pipeline and our pooled connection are warm before the first real claim
+_DUMMY_SAMPLE = {
+    "DriverRating": 1,
+    "Age": 30,
+    "PoliceReportFiled": 0,
+    "WeekOfMonthClaimed": 1,
+    "PolicyType": 1,
+    "WeekOfMonth": 1,
+    "AccidentArea": 1,
+    "Sex": 1,
+    "Deductible": 500
+}
+_DUMMY_BODY = json.dumps(_DUMMY_SAMPLE)
+
+# IMPORTANT: Azure ML scoring.py expects NUMERIC values for categorical fields
+# The label encoders on the server side will handle the encoding
+# Mappings: string to numeric (reverse of what scoring.py has)
+ACCIDENT_AREA_MAP = {"Rural": 0, "Urban": 1}
+SEX_MAP = {"Female": 0, "Male": 1}
+POLICY_TYPE_MAP = {
+    "Sedan - All Perils": 0,
+    "Sedan - Collision": 1,
+    "Sedan - Liability": 2,
+    "Sport - All Perils": 3,
+    "Sport - Collision": 4,
+    "Sport - Liability": 5,
+    "Utility - All Perils": 6,
+    "Utility - Collision": 7,
+    "Utility - Liability": 8
+}
+POLICE_REPORT_MAP = {"No": 0, "Yes": 1}
+
+# Model features in payload order, with the value used when a claim omits one
+FEATURE_COLUMNS = (
+    "DriverRating", "Age", "WeekOfMonthClaimed", "WeekOfMonth", "Deductible",
+    "AccidentArea", "Sex", "PolicyType", "PoliceReportFiled"
+)
+FEATURE_DEFAULTS = (
+    1, 30, 1, 1, 500,
+    1,  # Urban
+    1,  # Male
+    2,  # Sedan - Liability
+    0   # No police report
+)
+CATEGORY_MAPS = {
+    "AccidentArea": ACCIDENT_AREA_MAP,
+    "Sex": SEX_MAP,
+    "PolicyType": POLICY_TYPE_MAP,
+    "PoliceReportFiled": POLICE_REPORT_MAP
+}
+
+
+def _encode_value(column, value, default):
+    """Encode one feature: category labels via CATEGORY_MAPS, everything else as int"""
+    if isinstance(value, str) and column in CATEGORY_MAPS:
+        return CATEGORY_MAPS[column].get(value, default)
+    return int(value)
+
+
+def encode_features(values, out=None):
+    """
+    Encode one claim's raw feature values into a preallocated int32 vector
+
+    Args:
+        values (iterable): Raw values in FEATURE_COLUMNS order; None means
+            use the feature default
+        out (np.ndarray): Optional (9,) buffer to fill in place
+
+    Returns:
+        np.ndarray: The filled buffer
+    """
+    if out is None:
+        out = np.empty(len(FEATURE_COLUMNS), dtype=np.int32)
+    for j, (column, default, value) in enumerate(zip(FEATURE_COLUMNS, FEATURE_DEFAULTS, values)):
+        out[j] = _encode_value(column, default if value is None else value, default)
+    return out
+
+
+def _encode_batch(claims):
+    """
+    Encode many claims into one (N, 9) int64 feature matrix
+
+    Built column by column so the per-claim work is a single dict lookup
+    per feature instead of rebuilding a payload dict for every claim.
+
+    Args:
+        claims (list): Claim dicts (see FraudDetectorAgent.detect_fraud)
+
+    Returns:
+        np.ndarray: Rows in claim order, columns in FEATURE_COLUMNS order
+    """
+    out = np.empty((len(claims), len(FEATURE_COLUMNS)), dtype=np.int64)
+    for j, (column, default) in enumerate(zip(FEATURE_COLUMNS, FEATURE_DEFAULTS)):
+        out[:, j] = [_encode_value(column, claim.get(column, default), default) for claim in claims]
+    return out
+
+
 class FraudDetectorAgent:
-    def __init__(self):
-        """Initialize Fraud Detector Agent with Azure ML endpoint"""
+    def __init__(self, warm_up=False):
+        """
+        Initialize Fraud Detector Agent with Azure ML endpoint
+        
+        Args:
+            warm_up (bool): Send a throwaway (billable) prediction in a
+                background thread so the first real call does not pay
+                cold-start latency; only long-lived app clients should opt in
+        """
         self.scoring_uri = os.getenv("AZURE_ML_ENDPOINT")
         self.api_key = os.getenv("AZURE_ML_API_KEY")
         
         if not self.scoring_uri or not self.api_key:
             raise ValueError("Azure ML endpoint credentials not found in .env file")
+        
+        # Request headers are fixed per agent, build them once
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        
+        if warm_up:
+            threading.Thread(target=self.warm_up, name="fraud-warmup", daemon=True).start()
+    
+    def warm_up(self):
+        """
+        Post the cached dummy sample to the endpoint and discard the result
+        
+        Returns:
+            bool: True if the endpoint answered with status 200
+        """
+        try:
+            response = SESSION.post(
+                self.scoring_uri,
+                data=_DUMMY_BODY,
+                headers=self.headers,
+                timeout=30
+            )
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+    
+    def _build_payload(self, claim_data):
+        """
+        Convert claim fields into the numeric sample the scoring script expects
+
+        Args:
+            claim_data (dict): Fraud detection fields (see detect_fraud)
+
+        Returns:
+            dict: Model input with categorical values encoded as numbers
+        """
+        # Send categorical values as NUMBERS (0, 1, 2, etc.)
+        # Azure ML's scoring.py expects numeric values
+        return {
+            column: _encode_value(column, claim_data.get(column, default), default)
+            for column, default in zip(FEATURE_COLUMNS, FEATURE_DEFAULTS)
+        }
+    
+    @staticmethod
+    def _format_prediction(pred):
+        """Map one entry of the endpoint's predictions list to an agent result"""
+        fraud_prediction = pred.get("fraud_prediction", 0)
+        fraud_probability = pred.get("fraud_probability", 0.0)
+        fraud_risk = pred.get("fraud_risk", "Unknown")
+        return {
+            "success": True,
+            "fraud_prediction": fraud_prediction,
+            "fraud_probability": round(fraud_probability, 4),
+            "fraud_risk": fraud_risk,
+            "threshold_used": pred.get("threshold_used", 0.5),
+            "is_fraud": fraud_prediction == 1,
+            "message": f"Fraud analysis complete: {fraud_risk}"
+        }
+    
+    @staticmethod
+    def _error_result(error, fraud_risk="Error"):
+        """Result returned when the endpoint could not score a claim"""
+        return {
+            "success": False,
+            "error": error,
+            "fraud_prediction": 0,
+            "fraud_probability": 0.0,
+            "fraud_risk": fraud_risk
+        }
     
     def detect_fraud(self, claim_data):
         """
@@ -40,105 +230,51 @@ class FraudDetectorAgent:
             dict: Fraud detection result with prediction, probability, and risk level
         """
         try:
-            # IMPORTANT: Azure ML scoring.py expects NUMERIC values for categorical fields
-            # The label encoders on the server side will handle the encoding
-            # Mappings: string to numeric (reverse of what scoring.py has)
-            accident_area_map = {"Rural": 0, "Urban": 1}
-            sex_map = {"Female": 0, "Male": 1}
-            policy_type_map = {
-                "Sedan - All Perils": 0,
-                "Sedan - Collision": 1, 
-                "Sedan - Liability": 2,
-                "Sport - All Perils": 3,
-                "Sport - Collision": 4,
-                "Sport - Liability": 5,
-                "Utility - All Perils": 6,
-                "Utility - Collision": 7,
-                "Utility - Liability": 8
-            }
-            police_report_map = {"No": 0, "Yes": 1}
-            
-            # Get values from claim_data
-            accident_area = claim_data.get("AccidentArea", 1)
-            sex = claim_data.get("Sex", 1)
-            policy_type = claim_data.get("PolicyType", 2)  # Default to Sedan - Liability
-            police_report = claim_data.get("PoliceReportFiled", 0)
-            
-            # Convert strings to numeric if needed
-            if isinstance(accident_area, str):
-                accident_area = accident_area_map.get(accident_area, 1)  # Default to Urban
-            else:
-                accident_area = int(accident_area)
-                
-            if isinstance(sex, str):
-                sex = sex_map.get(sex, 1)  # Default to Male
-            else:
-                sex = int(sex)
-                
-            if isinstance(policy_type, str):
-                policy_type = policy_type_map.get(policy_type, 2)  # Default to Sedan - Liability
-            else:
-                policy_type = int(policy_type)
-                
-            if isinstance(police_report, str):
-                police_report = police_report_map.get(police_report, 0)  # Default to No
-            else:
-                police_report = int(police_report)
-            
-            # Prepare required fields for model
-            # Send categorical values as NUMBERS (0, 1, 2, etc.)
-            # Azure ML's scoring.py expects numeric values
-            payload = {
-                "DriverRating": int(claim_data.get("DriverRating", 1)),
-                "Age": int(claim_data.get("Age", 30)),
-                "WeekOfMonthClaimed": int(claim_data.get("WeekOfMonthClaimed", 1)),
-                "WeekOfMonth": int(claim_data.get("WeekOfMonth", 1)),
-                "Deductible": int(claim_data.get("Deductible", 500)),
-                "AccidentArea": accident_area,  # Numeric: 0 (Rural) or 1 (Urban)
-                "Sex": sex,  # Numeric: 0 (Female) or 1 (Male)
-                "PolicyType": policy_type,  # Numeric: 0-8
-                "PoliceReportFiled": police_report  # Numeric: 0 (No) or 1 (Yes)
-            }
-            
-            # DEBUG: Print what we're sending to ML
-            print("\n" + "="*70)
-            print("🚀 FRAUD DETECTOR - SENDING TO AZURE ML:")
-            print(json.dumps(payload, indent=2))
-            print("="*70 + "\n")
-            
-            # Prepare headers
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
+            payload = self._build_payload(claim_data)
+        except Exception as e:
+            return self._error_result(f"Fraud detection error: {str(e)}")
+        
+        return self._score_payload(payload)
+    
+    def detect_fraud_vec(self, features):
+        """
+        Score one claim that is already encoded as a feature vector
+        
+        Skips the per-field dict encoding of detect_fraud().
+        
+        Args:
+            features (np.ndarray): (9,) values in FEATURE_COLUMNS order,
+                e.g. from encode_features()
+        
+        Returns:
+            dict: Same result format as detect_fraud()
+        """
+        return self._score_payload(dict(zip(FEATURE_COLUMNS, features.tolist())))
+    
+    def _score_payload(self, payload):
+        """Post one encoded sample to the endpoint and format its prediction"""
+        logger.debug("fraud payload sent to Azure ML: %s", payload)
+        try:
             # Call Azure ML endpoint
-            response = requests.post(
+            response = SESSION.post(
                 self.scoring_uri,
                 data=json.dumps(payload),
-                headers=headers,
+                headers=self.headers,
                 timeout=30
             )
             
             if response.status_code != 200:
                 print(f"⚠️ Azure ML ERROR - Status {response.status_code}")
                 print(f"Response: {response.text}")
-                return {
-                    "success": False,
-                    "error": f"Azure ML endpoint returned status {response.status_code}",
-                    "fraud_prediction": 0,
-                    "fraud_probability": 0.0,
-                    "fraud_risk": "Unknown"
-                }
+                return self._error_result(
+                    f"Azure ML endpoint returned status {response.status_code}",
+                    fraud_risk="Unknown"
+                )
             
             # Parse response
             result = response.json()
             
-            # DEBUG: Print raw ML response
-            print("\n" + "="*70)
-            print("📥 FRAUD DETECTOR - RAW AZURE ML RESPONSE:")
-            print(json.dumps(result, indent=2))
-            print("="*70 + "\n")
+            logger.debug("raw Azure ML response: %s", result)
             
             # Handle double-encoded JSON
             if isinstance(result, str):
@@ -161,43 +297,76 @@ class FraudDetectorAgent:
             
             # Extract prediction details
             if "predictions" in result:
-                pred = result["predictions"][0]
-                fraud_prediction = pred["fraud_prediction"]
-                fraud_probability = pred["fraud_probability"]
-                fraud_risk = pred.get("fraud_risk", "Unknown")
-                threshold = pred.get("threshold_used", 0.5)
-            else:
-                fraud_prediction = result.get("fraud_prediction", 0)
-                fraud_probability = result.get("fraud_probability", 0.0)
-                fraud_risk = result.get("fraud_risk", "Unknown")
-                threshold = result.get("threshold_used", 0.5)
+                return self._format_prediction(result["predictions"][0])
+            return self._format_prediction(result)
+            
+        except requests.exceptions.RequestException as e:
+            return self._error_result(f"Network error calling Azure ML: {str(e)}")
+        except Exception as e:
+            return self._error_result(f"Fraud detection error: {str(e)}")
+    
+    def detect_fraud_many(self, claims):
+        """
+        Score several claims with a single Azure ML request
+        
+        scoring.py accepts a JSON array and returns one entry in
+        "predictions" per sample, in input order.
+        
+        Args:
+            claims (list): Claim dicts in the same format as detect_fraud()
+        
+        Returns:
+            list: One detect_fraud()-style result per claim, in input order
+        """
+        if not claims:
+            return []
+        
+        try:
+            features = _encode_batch(claims)
+            payload = [dict(zip(FEATURE_COLUMNS, row)) for row in features.tolist()]
             
-            return {
-                "success": True,
-                "fraud_prediction": fraud_prediction,
-                "fraud_probability": round(fraud_probability, 4),
-                "fraud_risk": fraud_risk,
-                "threshold_used": threshold,
-                "is_fraud": fraud_prediction == 1,
-                "message": f"Fraud analysis complete: {fraud_risk}"
-            }
+            response = SESSION.post(
+                self.scoring_uri,
+                data=json.dumps(payload),
+                headers=self.headers,
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                print(f"⚠️ Azure ML ERROR - Status {response.status_code}")
+                print(f"Response: {response.text}")
+                error = self._error_result(
+                    f"Azure ML endpoint returned status {response.status_code}",
+                    fraud_risk="Unknown"
+                )
+                return [dict(error) for _ in claims]
+            
+            result = response.json()
+            
+            # Handle double-encoded JSON
+            if isinstance(result, str):
+                result = json.loads(result)
+            
+            if "error" in result:
+                error_msg = result.get("error", "Unknown error")
+                print(f"⚠️ AZURE ML MODEL ERROR: {error_msg}")
+                error = self._error_result(f"Azure ML model error: {error_msg}")
+                return [dict(error) for _ in claims]
+            
+            predictions = result.get("predictions", [])
+            if len(predictions) != len(claims):
+                error = self._error_result(
+                    f"Azure ML returned {len(predictions)} predictions for {len(claims)} claims"
+                )
+                return [dict(error) for _ in claims]
+            
+            return [self._format_prediction(pred) for pred in predictions]
             
         except requests.exceptions.RequestException as e:
-            return {
-                "success": False,
-                "error": f"Network error calling Azure ML: {str(e)}",
-                "fraud_prediction": 0,
-                "fraud_probability": 0.0,
-                "fraud_risk": "Error"
-            }
+            error = self._error_result(f"Network error calling Azure ML: {str(e)}")
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Fraud detection error: {str(e)}",
-                "fraud_prediction": 0,
-                "fraud_probability": 0.0,
-                "fraud_risk": "Error"
-            }
+            error = self._error_result(f"Fraud detection error: {str(e)}")
+        return [dict(error) for _ in claims]
     
     def get_risk_recommendation(self, fraud_result):
         """
@@ -224,6 +393,93 @@ class FraudDetectorAgent:
             return "✅ LOW FRAUD RISK - Claim appears legitimate, proceed with standard review"
 
 
+class BatchingProxy:
+    """
+    Groups concurrent detect_fraud() calls into detect_fraud_many() requests
+    
+    A background thread collects submitted claims until either batch_size
+    claims are pending or batch_timeout seconds have passed since the first
+    one arrived, sends them in one Azure ML call and resolves each caller's
+    Future with its own prediction.
+    """
+    
+    def __init__(self, agent=None, batch_size=32, batch_timeout=0.02):
+        """
+        Args:
+            agent (FraudDetectorAgent): Agent used to score batches (created if None)
+            batch_size (int): Max claims per Azure ML request
+            batch_timeout (float): Max seconds to wait for a batch to fill
+        """
+        self.agent = agent or FraudDetectorAgent()
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="fraud-batcher", daemon=True)
+        self._worker.start()
+    
+    def submit(self, claim_data):
+        """
+        Queue a claim for scoring
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the detect_fraud() result
+        """
+        if self._closed:
+            raise RuntimeError("BatchingProxy is closed")
+        future = Future()
+        self._queue.put((claim_data, future))
+        return future
+    
+    def detect_fraud(self, claim_data):
+        """Blocking drop-in for FraudDetectorAgent.detect_fraud()"""
+        return self.submit(claim_data).result()
+    
+    def close(self):
+        """Flush pending claims and stop the background thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            deadline = time.monotonic() + self.batch_timeout
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._dispatch(batch)
+            if stop:
+                return
+    
+    def _dispatch(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            results = self.agent.detect_fraud_many([claim for claim, _ in batch])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+
 # Test function
 if __name__ == "__main__":
     print("Testing Fraud Detector Agent...")
@@ -142,34 +142,7 @@ class FraudMLModel:
             fraud_prob = self.model.predict_proba(features_scaled)[0][1]  # Probability of fraud (class 1)
             fraud_prediction = self.model.predict(features_scaled)[0]
             
-            # Convert probability to risk score (0-100)
-            risk_score = int(fraud_prob * 100)
-            
-            # Determine risk level
-            if risk_score >= 70:
-                risk_level = "HIGH"
-            elif risk_score >= 50:
-                risk_level = "MEDIUM"
-            elif risk_score >= 30:
-                risk_level = "LOW"
-            else:
-                risk_level = "MINIMAL"
-            
-            # Get feature importance if available
-            feature_importance = {}
-            if hasattr(self.model, 'feature_importances_'):
-                for name, importance in zip(self.feature_names, self.model.feature_importances_):
-                    feature_importance[name] = float(importance)
-            
-            return {
-                "ml_fraud_probability": fraud_prob,
-                "ml_risk_score": risk_score,
-                "ml_risk_level": risk_level,
-                "ml_prediction": "FRAUD" if fraud_prediction == 1 else "LEGITIMATE",
-                "ml_confidence": max(fraud_prob, 1 - fraud_prob) * 100,
-                "feature_importance": feature_importance,
-                "model_used": type(self.model).__name__ if self.model else "None"
-            }
+            return self._build_prediction(fraud_prob, fraud_prediction)
             
         except Exception as e:
             print(f"❌ ML prediction error: {e}")
@@ -182,6 +155,86 @@ class FraudMLModel:
                 "error": str(e)
             }
     
+    def predict_fraud_batch(self, claims, policies):
+        """
+        Predict fraud probability for several claims with one model call
+        
+        Args:
+            claims: List of claim information dicts
+            policies: List of policy validation dicts (same order as claims)
+            
+        Returns:
+            list of dicts, one per claim, in the same format as predict_fraud
+        
+        Raises:
+            ValueError: If claims and policies differ in length
+        """
+        if len(claims) != len(policies):
+            raise ValueError(f"Got {len(claims)} claims but {len(policies)} policies")
+        if not claims:
+            return []
+        
+        try:
+            # Stack per-claim feature rows into one (N, n_features) matrix
+            features = np.vstack([
+                self.extract_features(claim_data, policy_data)
+                for claim_data, policy_data in zip(claims, policies)
+            ])
+            
+            if self.model is None:
+                return [self._rule_based_fallback(row.reshape(1, -1)) for row in features]
+            
+            if self.scaler:
+                features_scaled = self.scaler.transform(features)
+            else:
+                features_scaled = features
+            
+            fraud_probs = self.model.predict_proba(features_scaled)[:, 1]
+            fraud_predictions = self.model.predict(features_scaled)
+            
+            return [
+                self._build_prediction(fraud_prob, fraud_prediction)
+                for fraud_prob, fraud_prediction in zip(fraud_probs, fraud_predictions)
+            ]
+            
+        except Exception as e:
+            print(f"❌ ML batch prediction error: {e}")
+            return [self.predict_fraud(claim_data, policy_data)
+                    for claim_data, policy_data in zip(claims, policies)]
+    
+    def _build_prediction(self, fraud_prob, fraud_prediction):
+        """
+        Build the prediction result dict from model outputs
+        """
+        # Convert probability to risk score (0-100)
+        risk_score = int(fraud_prob * 100)
+        
+        # Determine risk level
+        if risk_score >= 70:
+            risk_level = "HIGH"
+        elif risk_score >= 50:
+            risk_level = "MEDIUM"
+        elif risk_score >= 30:
+            risk_level = "LOW"
+        else:
+            risk_level = "MINIMAL"
+        
+        # Get feature importance if available
+        feature_importance = {}
+        if hasattr(self.model, 'feature_importances_'):
+            for name, importance in zip(self.feature_names, self.model.feature_importances_):
+                feature_importance[name] = float(importance)
+        
+        return {
+            "ml_fraud_probability": fraud_prob,
+            "ml_risk_score": risk_score,
+            "ml_risk_level": risk_level,
+            "ml_prediction": "FRAUD" if fraud_prediction == 1 else "LEGITIMATE",
+            "ml_confidence": max(fraud_prob, 1 - fraud_prob) * 100,
+            "feature_importance": feature_importance,
+            "model_used": type(self.model).__name__ if self.model else "None"
+        }
+    
     def _rule_based_fallback(self, features):
         """
         Simple rule-based fallback when ML model is not available
@@ -0,0 +1,133 @@
+"""
+HTTP Session helpers for Azure ML endpoint calls
+
+Builds keep-alive requests.Session objects that retry transient
+failures (429/5xx, timeouts) with exponential backoff plus jitter.
+"""
+
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.util.retry import Retry
+
+# AAD scope for Azure ML online endpoints
+AZURE_ML_SCOPE = "https://ml.azure.com/.default"
+
+
+class JitterRetry(Retry):
+    """
+    urllib3 Retry that adds 10-50 ms of random jitter to each backoff
+    so concurrent clients do not retry in lockstep.
+    """
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0.01, 0.05)
+
+
+class AzureTokenAuth(AuthBase):
+    """
+    requests auth that signs calls with an AAD bearer token.
+
+    One DefaultAzureCredential is reused and its token is cached until
+    refresh_margin seconds before expires_on, so each request does not pay
+    a managed-identity / IMDS round-trip.
+    """
+
+    def __init__(self, scope=AZURE_ML_SCOPE, credential=None, refresh_margin=60):
+        if credential is None:
+            from azure.identity import DefaultAzureCredential
+            credential = DefaultAzureCredential()
+        self.scope = scope
+        self.credential = credential
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_on = 0
+
+    def token(self):
+        """Return a valid access token, fetching a new one only near expiry."""
+        with self._lock:
+            if self._expires_on - self.refresh_margin < time.time():
+                access_token = self.credential.get_token(self.scope)
+                self._token = access_token.token
+                self._expires_on = access_token.expires_on
+            return self._token
+
+    def __call__(self, r):
+        r.headers["Authorization"] = f"Bearer {self.token()}"
+        return r
+
+
+def create_session(headers=None, pool_connections=1, pool_maxsize=10, retries=3, backoff_factor=0.5):
+    """
+    Create a pooled requests.Session with retry on transient errors
+
+    Args:
+        headers: Default headers sent with every request
+        pool_connections: Number of host pools to cache
+        pool_maxsize: Max connections kept alive per host
+        retries: Max retries for 429/502/503/504 and connection errors
+        backoff_factor: Exponential backoff base in seconds
+
+    Returns:
+        requests.Session
+    """
+    retry = JitterRetry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=["POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_endpoint_session(api_key=None, pool_connections=4, pool_maxsize=16, retries=2, backoff_factor=0.2):
+    """
+    Create a pooled session for scoring calls to an Azure ML endpoint
+
+    Sends the key as a fixed Bearer header when api_key is set, otherwise
+    signs each call with one cached AAD token (AzureTokenAuth).
+
+    Args:
+        api_key: Endpoint key, or None to use DefaultAzureCredential
+        pool_connections: Number of host pools to cache
+        pool_maxsize: Max connections kept alive per host
+        retries: Max retries for 429/502/503/504 and connection errors
+        backoff_factor: Exponential backoff base in seconds
+
+    Returns:
+        requests.Session
+    """
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+
+    session = create_session(
+        headers=headers,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        retries=retries,
+        backoff_factor=backoff_factor
+    )
+    if not api_key:
+        session.auth = AzureTokenAuth()
+    return session
@@ -9,8 +9,18 @@ import pandas as pd
 from datetime import datetime
 import json
 import os
+import threading
 from typing import Dict, List, Optional
 
+from json_utils import loads
+
+
+# Parsed review queues keyed by path -> ((st_mtime_ns, st_size), queue);
+# reloaded only when the file changes on disk. The cached list is handed out
+# as-is, so callers treat it as read-only and build a new list to change it.
+_QUEUE_CACHE: Dict[str, tuple] = {}
+_QUEUE_LOCK = threading.RLock()
+
 
 class HumanReviewAgent:
     """
@@ -93,21 +103,42 @@ class HumanReviewAgent:
     
     def _add_to_queue(self, review_record: Dict):
         """Add review record to the queue"""
-        queue = self._load_queue()
-        queue.append(review_record)
-        self._save_queue(queue)
+        with _QUEUE_LOCK:
+            self._save_queue(self._load_queue() + [review_record])
     
     def _load_queue(self) -> List[Dict]:
-        """Load pending reviews from queue"""
-        if os.path.exists(self.review_queue_file):
-            with open(self.review_queue_file, 'r') as f:
-                return json.load(f)
-        return []
+        """Load pending reviews from queue (cached until the file changes; do not mutate the result)"""
+        with _QUEUE_LOCK:
+            try:
+                version = self._file_version()
+            except FileNotFoundError:
+                return []
+            
+            cached = _QUEUE_CACHE.get(self.review_queue_file)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            
+            with open(self.review_queue_file, 'rb') as f:
+                raw = f.read()
+            queue = loads(raw)
+            _QUEUE_CACHE[self.review_queue_file] = (version, queue)
+            return queue
+    
+    def _file_version(self) -> tuple:
+        """(st_mtime_ns, st_size) of the queue file; size catches rewrites within a coarse mtime tick"""
+        stat = os.stat(self.review_queue_file)
+        return stat.st_mtime_ns, stat.st_size
     
     def _save_queue(self, queue: List[Dict]):
-        """Save review queue to file"""
-        with open(self.review_queue_file, 'w') as f:
-            json.dump(queue, f, indent=2)
+        """Save review queue to file (the list becomes the cached queue; do not mutate it afterwards)"""
+        with _QUEUE_LOCK:
+            # Write a temp file and swap it in so readers never see a partial queue
+            tmp_path = self.review_queue_file + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(queue, f, indent=2)
+            os.replace(tmp_path, self.review_queue_file)
+            # Cache only once the file holds this queue
+            _QUEUE_CACHE[self.review_queue_file] = (self._file_version(), queue)
     
     def get_pending_reviews(self) -> List[Dict]:
         """Get all pending reviews"""
@@ -128,59 +159,63 @@ class HumanReviewAgent:
         Returns:
             Updated review record
         """
-        queue = self._load_queue()
+        with _QUEUE_LOCK:
+            queue = self._load_queue()
+            index = next((i for i, r in enumerate(queue) if r['review_id'] == review_id), None)
+            if index is None:
+                raise ValueError(f"Review ID {review_id} not found")
+            
+            # The loaded list is the shared cache: build an updated copy instead of mutating it
+            record = dict(
+                queue[index],
+                status='reviewed',
+                final_decision=decision,
+                reviewer_notes=notes,
+                reviewed_by=reviewer_name,
+                review_date=datetime.now().isoformat()
+            )
+            
+            # Save updated queue
+            self._save_queue(queue[:index] + [record] + queue[index + 1:])
         
-        for record in queue:
-            if record['review_id'] == review_id:
-                record['status'] = 'reviewed'
-                record['final_decision'] = decision
-                record['reviewer_notes'] = notes
-                record['reviewed_by'] = reviewer_name
-                record['review_date'] = datetime.now().isoformat()
-                
-                # Save updated queue
-                self._save_queue(queue)
-                
-                # Archive to history
-                self._add_to_history(record)
-                
-                # Log to Audit Agent
-                try:
-                    from audit_agent import get_audit_agent
-                    audit_agent = get_audit_agent()
-                    
-                    claim_data = record.get('claim_data', {})
-                    analysis_result = record.get('analysis_result', {})
-                    
-                    audit_agent.log_human_review_action(
-                        policy_number=claim_data.get('policy_number', 'UNKNOWN'),
-                        action="manual_review_decision",
-                        inputs={
-                            "ai_recommendation": analysis_result.get('eligibility_decision', 'UNKNOWN'),
-                            "ai_confidence": record.get('confidence_score', 0),
-                            "reason_for_review": "Low confidence score - manual validation required",
-                            "claim_details": claim_data
-                        },
-                        outputs={
-                            "final_decision": decision,
-                            "reasoning": notes,
-                            "review_date": record['review_date']
-                        },
-                        decision=decision,
-                        reviewer_name=reviewer_name,
-                        review_notes=notes,
-                        original_confidence=record.get('confidence_score', 0),
-                        metadata={
-                            "review_id": review_id,
-                            "review_duration": "calculated_at_runtime"
-                        }
-                    )
-                except Exception as e:
-                    print(f"⚠️ Failed to log human review to audit: {e}")
-                
-                return record
+        # Archive to history
+        self._add_to_history(record)
+        
+        # Log to Audit Agent
+        try:
+            from audit_agent import get_audit_agent
+            audit_agent = get_audit_agent()
+            
+            claim_data = record.get('claim_data', {})
+            analysis_result = record.get('analysis_result', {})
+            
+            audit_agent.log_human_review_action(
+                policy_number=claim_data.get('policy_number', 'UNKNOWN'),
+                action="manual_review_decision",
+                inputs={
+                    "ai_recommendation": analysis_result.get('eligibility_decision', 'UNKNOWN'),
+                    "ai_confidence": record.get('confidence_score', 0),
+                    "reason_for_review": "Low confidence score - manual validation required",
+                    "claim_details": claim_data
+                },
+                outputs={
+                    "final_decision": decision,
+                    "reasoning": notes,
+                    "review_date": record['review_date']
+                },
+                decision=decision,
+                reviewer_name=reviewer_name,
+                review_notes=notes,
+                original_confidence=record.get('confidence_score', 0),
+                metadata={
+                    "review_id": review_id,
+                    "review_duration": "calculated_at_runtime"
+                }
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to log human review to audit: {e}")
         
-        raise ValueError(f"Review ID {review_id} not found")
+        return record
     
     def _add_to_history(self, review_record: Dict):
         """Archive completed review to history"""
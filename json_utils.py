@@ -0,0 +1,45 @@
+"""
+JSON helpers shared by the agents and test scripts
+
+Uses orjson when it is installed and the stdlib json module otherwise.
+Both paths return the same types: dumps_body() always gives compact
+bytes and dumps_pretty() always gives str.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib
+    orjson = None
+
+
+def dumps_body(obj, default=None, sort_keys=False) -> bytes:
+    """
+    Serialize obj as compact JSON bytes (request bodies, blobs, cache keys)
+
+    Args:
+        obj: JSON-serializable object
+        default: Called for objects JSON cannot encode (e.g. str)
+        sort_keys: Emit object keys in sorted order
+
+    Returns:
+        bytes: UTF-8 JSON without whitespace
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, default=default, sort_keys=sort_keys, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_pretty(obj) -> str:
+    """Serialize obj as indented JSON text."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
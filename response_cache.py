@@ -0,0 +1,111 @@
+"""
+Response Cache - Local SQLite cache for Azure ML endpoint responses
+
+Test scripts send the same scenario payloads to the scoring endpoint on
+every run. Responses are stored keyed by SHA-256(scoring_uri + sorted JSON
+payload) so repeat runs skip the network round-trip.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from json_utils import dumps_body
+
+DEFAULT_CACHE_PATH = ".response_cache.sqlite"
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of raw endpoint responses.
+    Safe to share between threads of one process.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, enabled: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if self.enabled:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response BLOB, ts INTEGER)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(scoring_uri: str, payload: Any) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            scoring_uri: Endpoint the payload is sent to
+            payload: JSON-serializable request payload
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        body = dumps_body(payload, sort_keys=True)
+        return hashlib.sha256(scoring_uri.encode("utf-8") + body).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached response for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, response: bytes) -> None:
+        """Store a response under key."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, int(time.time()))
+            )
+            self._conn.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Return the cached response, calling compute() on a miss.
+
+        Args:
+            key: Cache key from make_key()
+            compute: Produces the response bytes; returning None skips caching
+
+        Returns:
+            bytes: Cached or freshly computed response
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = compute()
+        if response is not None:
+            self.set(key, response)
+        return response
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,74 @@
+"""
+SQL Connection helper for Azure SQL admin scripts
+
+Keeps one pyodbc connection per process. get_conn() probes it with a
+cheap SELECT 1 and reconnects if the server dropped it, so repeated
+script runs in one interpreter (e.g. under pytest) pay the connect
+handshake once.
+"""
+
+import atexit
+import os
+import pyodbc
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Reuse driver-level connections across connects in this process
+pyodbc.pooling = True
+
+_CONN = None
+
+
+def build_connection_string():
+    """
+    Build the ODBC Driver 18 connection string from AZURE_SQL_* settings
+
+    Returns:
+        str: pyodbc connection string
+    """
+    return (
+        f"DRIVER={{ODBC Driver 18 for SQL Server}};"
+        f"SERVER={os.getenv('AZURE_SQL_SERVER')};"
+        f"DATABASE={os.getenv('AZURE_SQL_DATABASE')};"
+        f"UID={os.getenv('AZURE_SQL_USERNAME')};"
+        f"PWD={os.getenv('AZURE_SQL_PASSWORD')};"
+        f"Encrypt=yes;"
+        f"TrustServerCertificate=yes;"
+        f"Packet Size=32768;"
+    )
+
+
+def get_conn(login_timeout=0):
+    """
+    Get the shared connection, reconnecting if it is closed or broken
+
+    Args:
+        login_timeout: Seconds to wait when a new connection has to be
+            opened (0 uses the driver default)
+
+    Returns:
+        pyodbc.Connection
+    """
+    global _CONN
+    if _CONN is not None:
+        try:
+            _CONN.execute("SELECT 1").fetchone()
+            return _CONN
+        except pyodbc.Error:
+            _close()
+    _CONN = pyodbc.connect(build_connection_string(), autocommit=False, timeout=login_timeout)
+    return _CONN
+
+
+def _close():
+    global _CONN
+    if _CONN is not None:
+        try:
+            _CONN.close()
+        except pyodbc.Error:
+            pass
+        _CONN = None
+
+
+atexit.register(_close)
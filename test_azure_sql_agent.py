@@ -16,7 +16,8 @@ print("=" * 60)
 
 # Test 1: Connect to database
 print("\n✅ Test 1: Connection Test")
-if sql_agent.connect():
+# Reuse the connection if the agent already has one
+if sql_agent.connection or sql_agent.connect():
     print("   ✓ Successfully connected to Azure SQL Database")
 else:
     print("   ✗ Failed to connect")
@@ -156,51 +156,42 @@ def test_audit_agent():
     try:
         agent = get_audit_agent()
         
-        # Test logging document extraction
-        log1_time = time.time()
-        agent.log_document_agent_action(
-            policy_number="POL90927",
-            action="ocr_extraction",
-            inputs={"file": "test.pdf"},
-            outputs={"extracted_fields": 10},
-            metadata={"test": True}
-        )
-        log1_elapsed = time.time() - log1_time
-        
-        # Test logging fraud detection
-        log2_time = time.time()
-        agent.log_fraud_detection_action(
-            policy_number="POL90927",
-            action="fraud_detection_ml",
-            inputs={"DriverRating": 1, "Age": 30},
-            outputs={"fraud_probability": 0.25},
-            fraud_probability=0.25,
-            fraud_prediction=0,
-            fraud_risk_level="LOW",
-            metadata={"test": True}
-        )
-        log2_elapsed = time.time() - log2_time
+        # Document, fraud and eligibility logs are uploaded concurrently
+        doc_entry = ("log_document_agent_action", {
+            "policy_number": "POL90927",
+            "action": "ocr_extraction",
+            "inputs": {"file": "test.pdf"},
+            "outputs": {"extracted_fields": 10},
+            "decision": "SUCCESS",
+            "metadata": {"test": True}
+        })
+        fraud_entry = ("log_fraud_detection_action", {
+            "policy_number": "POL90927",
+            "action": "fraud_detection_ml",
+            "inputs": {"DriverRating": 1, "Age": 30},
+            "outputs": {"fraud_probability": 0.25},
+            "fraud_probability": 0.25,
+            "fraud_prediction": 0,
+            "fraud_risk_level": "LOW",
+            "metadata": {"test": True}
+        })
+        elig_entry = ("log_eligibility_agent_action", {
+            "policy_number": "POL90927",
+            "action": "eligibility_check",
+            "inputs": {"claim_amount": 5000},
+            "outputs": {"decision": "ELIGIBLE"},
+            "decision": "ELIGIBLE",
+            "confidence_score": 85,
+            "metadata": {"test": True}
+        })
         
-        # Test logging eligibility analysis
-        log3_time = time.time()
-        agent.log_eligibility_agent_action(
-            policy_number="POL90927",
-            action="eligibility_check",
-            inputs={"claim_amount": 5000},
-            outputs={"decision": "ELIGIBLE"},
-            eligibility_decision="ELIGIBLE",
-            confidence_score=85,
-            metadata={"test": True}
-        )
-        log3_elapsed = time.time() - log3_time
+        logged = asyncio.run(agent.log_many([doc_entry, fraud_entry, elig_entry]))
         
         elapsed = time.time() - start_time
         
         print(f"✅ Audit Agent completed")
         print(f"⏱️  Total Response Time: {elapsed:.3f}s")
-        print(f"   - Document Log: {log1_elapsed:.3f}s")
-        print(f"   - Fraud Log: {log2_elapsed:.3f}s")
-        print(f"   - Eligibility Log: {log3_elapsed:.3f}s")
+        print(f"   - Logs Uploaded: {sum(logged)}/{len(logged)} (concurrent)")
         print(f"📊 Average Per Log: {elapsed/3:.3f}s")
         print(f"📁 Storage: Azure Blob Storage")
         print(f"📝 Log Format: JSON with timestamp")
@@ -224,6 +215,27 @@ def test_audit_agent():
         return None
 
 
+# Fixed per-step estimates (seconds) for agents not measured here
+FIXED_STEP_TIME = (
+    0.5 +  # Orchestrator
+    1.0 +  # SQL
+    3.0 +  # Eligibility
+    1.3 +  # Fraud
+    3.0    # Communication
+)
+
+
+def estimate_workflow_time(doc_time, hr_time, audit_time):
+    """
+    Estimate end-to-end workflow time without and with human review.
+    
+    Uses only arithmetic, so NumPy arrays can be passed to evaluate a whole
+    grid of doc/review/audit timings in one call for parameter sweeps.
+    """
+    total = FIXED_STEP_TIME + doc_time + audit_time
+    return total, total + hr_time
+
+
 def main():
     """Run all performance tests"""
     print("\n" + "🔍"*35)
@@ -300,18 +312,10 @@ def main():
     print(f"📝 Audit Logging: {audit_time:.1f}s")
     print("="*70)
     
-    estimated_total = (
-        0.5 +  # Orchestrator
-        doc_time +
-        1.0 +  # SQL
-        3.0 +  # Eligibility
-        1.3 +  # Fraud
-        3.0 +  # Communication
-        audit_time
-    )
+    estimated_total, estimated_with_review = estimate_workflow_time(doc_time, hr_time, audit_time)
     
     print(f"⚡ TOTAL (No Human Review): ~{estimated_total:.1f}s")
-    print(f"⚡ TOTAL (With Human Review): ~{estimated_total + hr_time:.1f}s")
+    print(f"⚡ TOTAL (With Human Review): ~{estimated_with_review:.1f}s")
     print("="*70)
 
 
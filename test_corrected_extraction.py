@@ -1,5 +1,6 @@
 """Test AI extraction with corrected prompt"""
 import os
+import httpx
 from dotenv import load_dotenv
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.formrecognizer import DocumentAnalysisClient
@@ -16,10 +17,18 @@ document_client = DocumentAnalysisClient(
     credential=AzureKeyCredential(key)
 )
 
+# Pooled HTTP/2 transport so repeated extraction calls reuse one connection
+oai_http = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=60
+)
+
 openai_client = AzureOpenAI(
     api_key=os.getenv("AZURE_AISERVICES_APIKEY"),
     api_version="2024-02-15-preview",
-    azure_endpoint=os.getenv("AZURE_AISERVICES_ENDPOINT")
+    azure_endpoint=os.getenv("AZURE_AISERVICES_ENDPOINT"),
+    http_client=oai_http
 )
 
 # Read 4.pdf
@@ -33,10 +42,20 @@ with open(pdf_path, "rb") as f:
 poller = document_client.begin_analyze_document("prebuilt-layout", file_bytes)
 result = poller.result()
 
-extracted_text = ""
+# Only the first 2000 characters go into the prompt, so stop collecting
+# lines once that much text has been gathered
+MAX_PROMPT_CHARS = 2000
+buf = []
+n = 0
 for page in result.pages:
     for line in page.lines:
-        extracted_text += line.content + "\n"
+        buf.append(line.content + "\n")
+        n += len(line.content) + 1
+        if n >= MAX_PROMPT_CHARS:
+            break
+    if n >= MAX_PROMPT_CHARS:
+        break
+extracted_text = "".join(buf)
 
 # Use CORRECTED prompt (with text for categorical fields)
 deployment = os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini")
@@ -65,7 +84,7 @@ Important Instructions:
 - For numeric fields (driver_rating, age, week_of_month_claimed, week_of_month, deductible): Extract as numbers
 
 Extracted Text:
-{extracted_text[:2000]}
+{extracted_text[:MAX_PROMPT_CHARS]}
 
 Return ONLY a JSON object with these exact keys: policy_number, policyholder_name, claim_amount, reason_for_claim, policy_type, claim_date, driver_rating, age, police_report_filed, week_of_month_claimed, accident_area, sex, deductible, week_of_month
 """
@@ -1,19 +1,15 @@
 """Test Azure Document Intelligence with different models"""
 import os
+import asyncio
 from dotenv import load_dotenv
 from azure.core.credentials import AzureKeyCredential
-from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient
 
 load_dotenv()
 
 endpoint = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
 key = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
 
-document_client = DocumentAnalysisClient(
-    endpoint=endpoint,
-    credential=AzureKeyCredential(key)
-)
-
 pdf_path = "c:/Projects/DEMO/data/1.pdf"
 
 with open(pdf_path, "rb") as f:
@@ -26,22 +22,44 @@ models_to_try = [
     "prebuilt-document"
 ]
 
-for model_id in models_to_try:
-    print(f"\n{'='*60}")
-    print(f"Testing model: {model_id}")
-    print(f"{'='*60}")
-    
-    try:
-        poller = document_client.begin_analyze_document(model_id, file_bytes)
-        result = poller.result()
-        print(f"✅ SUCCESS with {model_id}!")
-        print(f"   Pages: {len(result.pages)}")
-        
-        if result.pages and result.pages[0].lines:
-            print(f"   First line: {result.pages[0].lines[0].content[:50]}...")
-        
-        break  # Stop on first success
-        
-    except Exception as e:
-        print(f"❌ FAILED with {model_id}")
-        print(f"   Error: {str(e)[:100]}")
+
+async def analyze(document_client, model_id):
+    """Run one model and return (model_id, result)."""
+    poller = await document_client.begin_analyze_document(model_id, file_bytes)
+    return model_id, await poller.result()
+
+
+async def main():
+    # Probe all models at once and keep whichever succeeds first
+    async with DocumentAnalysisClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(key)
+    ) as document_client:
+        tasks = [asyncio.create_task(analyze(document_client, m)) for m in models_to_try]
+
+        for done in asyncio.as_completed(tasks):
+            try:
+                model_id, result = await done
+            except Exception as e:
+                print(f"\n❌ FAILED: {str(e)[:100]}")
+                continue
+
+            # Stop on first success
+            for t in tasks:
+                t.cancel()
+
+            print(f"\n{'='*60}")
+            print(f"✅ SUCCESS with {model_id}!")
+            print(f"{'='*60}")
+            print(f"   Pages: {len(result.pages)}")
+
+            if result.pages and result.pages[0].lines:
+                print(f"   First line: {result.pages[0].lines[0].content[:50]}...")
+            break
+        else:
+            print(f"\n❌ All models failed: {', '.join(models_to_try)}")
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+asyncio.run(main())
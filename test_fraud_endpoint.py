@@ -4,21 +4,42 @@ Shows exactly what's being sent and received
 """
 
 import os
-import json
-import requests
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from response_cache import ResponseCache
+from http_session import create_endpoint_session
+from json_utils import dumps_body, dumps_pretty, loads
 
 load_dotenv()
 
-def test_ml_endpoint():
+SCORING_URI = os.environ.get("AZURE_ML_ENDPOINT")
+API_KEY = os.environ.get("AZURE_ML_API_KEY")
+
+
+# Feature values shared by every payload format (column order matters for the array formats)
+FEATURES = {
+    "DriverRating": 1,
+    "Age": 65,
+    "WeekOfMonthClaimed": 5,
+    "WeekOfMonth": 5,
+    "Deductible": 2000,
+    "AccidentArea": "Rural",
+    "Sex": "Male",
+    "PolicyType": "Sport - Collision",
+    "PoliceReportFiled": "No"
+}
+
+
+def test_ml_endpoint(use_cache=True):
     """Test the ML endpoint directly with raw requests"""
     
     print("=" * 80)
     print("🔬 DIRECT AZURE ML ENDPOINT TEST")
     print("=" * 80)
     
-    scoring_uri = os.getenv("AZURE_ML_ENDPOINT")
-    api_key = os.getenv("AZURE_ML_API_KEY")
+    scoring_uri = SCORING_URI
+    api_key = API_KEY
     
     if not scoring_uri or not api_key:
         print("❌ Missing environment variables:")
@@ -31,124 +52,103 @@ def test_ml_endpoint():
     
     # Test different payload formats that Azure ML might expect
     test_payloads = [
-        {
-            "name": "Format 1: Direct Features (Current)",
-            "payload": {
-                "DriverRating": 1,
-                "Age": 65,
-                "WeekOfMonthClaimed": 5,
-                "WeekOfMonth": 5,
-                "Deductible": 2000,
-                "AccidentArea": "Rural",
-                "Sex": "Male",
-                "PolicyType": "Sport - Collision",
-                "PoliceReportFiled": "No"
-            }
-        },
-        {
-            "name": "Format 2: With 'data' wrapper",
-            "payload": {
-                "data": {
-                    "DriverRating": 1,
-                    "Age": 65,
-                    "WeekOfMonthClaimed": 5,
-                    "WeekOfMonth": 5,
-                    "Deductible": 2000,
-                    "AccidentArea": "Rural",
-                    "Sex": "Male",
-                    "PolicyType": "Sport - Collision",
-                    "PoliceReportFiled": "No"
-                }
-            }
-        },
-        {
-            "name": "Format 3: With 'input_data' wrapper",
-            "payload": {
-                "input_data": {
-                    "DriverRating": 1,
-                    "Age": 65,
-                    "WeekOfMonthClaimed": 5,
-                    "WeekOfMonth": 5,
-                    "Deductible": 2000,
-                    "AccidentArea": "Rural",
-                    "Sex": "Male",
-                    "PolicyType": "Sport - Collision",
-                    "PoliceReportFiled": "No"
-                }
-            }
-        },
-        {
-            "name": "Format 4: Array format",
-            "payload": {
-                "data": [[1, 65, 5, 5, 2000, "Rural", "Male", "Sport - Collision", "No"]]
-            }
-        },
+        {"name": "Format 1: Direct Features (Current)", "payload": FEATURES},
+        {"name": "Format 2: With 'data' wrapper", "payload": {"data": FEATURES}},
+        {"name": "Format 3: With 'input_data' wrapper", "payload": {"input_data": FEATURES}},
+        {"name": "Format 4: Array format", "payload": {"data": [list(FEATURES.values())]}},
         {
             "name": "Format 5: With columns definition",
             "payload": {
                 "data": {
-                    "columns": ["DriverRating", "Age", "WeekOfMonthClaimed", "WeekOfMonth", "Deductible", 
-                               "AccidentArea", "Sex", "PolicyType", "PoliceReportFiled"],
-                    "data": [[1, 65, 5, 5, 2000, "Rural", "Male", "Sport - Collision", "No"]]
+                    "columns": list(FEATURES),
+                    "data": [list(FEATURES.values())]
                 }
             }
         }
     ]
     
-    for i, test in enumerate(test_payloads, 1):
-        print(f"\n{'=' * 80}")
-        print(f"🧪 TEST {i}: {test['name']}")
-        print(f"{'=' * 80}")
-        
-        print("\n📤 Sending Payload:")
-        print(json.dumps(test['payload'], indent=2))
+    # One keep-alive session so every payload variant reuses the same TLS connection;
+    # transient 429/5xx responses are retried with backoff
+    session = create_endpoint_session(
+        API_KEY,
+        pool_connections=1,
+        pool_maxsize=len(test_payloads),
+        retries=3,
+        backoff_factor=0.5
+    )
+    
+    cache = ResponseCache(enabled=use_cache)
+    
+    def fetch(payload, body):
+        """POST the pre-serialized body, serving successful responses from the local cache."""
+        key = ResponseCache.make_key(scoring_uri, payload)
+        cached = cache.get(key)
+        if cached is not None:
+            return 200, {"X-Response-Cache": "HIT"}, cached
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
+        response = session.post(scoring_uri, data=body, timeout=30)
+        if response.status_code == 200:
+            cache.set(key, response.content)
+        return response.status_code, dict(response.headers), response.content
+    
+    # Serialize each payload once; the same bytes are logged and sent
+    bodies = [dumps_body(test['payload']) for test in test_payloads]
+    
+    # Every probe is independent and network-bound, so send them all at once,
+    # but report (and pick the working format) in test_payloads priority order
+    executor = ThreadPoolExecutor(max_workers=len(test_payloads))
+    try:
+        futures = [executor.submit(fetch, test['payload'], body) for test, body in zip(test_payloads, bodies)]
         
-        try:
-            response = requests.post(
-                scoring_uri,
-                data=json.dumps(test['payload']),
-                headers=headers,
-                timeout=30
-            )
+        for i, (test, body, future) in enumerate(zip(test_payloads, bodies, futures), 1):
+            print(f"\n{'=' * 80}")
+            print(f"🧪 TEST {i}: {test['name']}")
+            print(f"{'=' * 80}")
             
-            print(f"\n📥 Response Status: {response.status_code}")
-            print(f"📥 Response Headers: {dict(response.headers)}")
+            print("\n📤 Sent Payload:")
+            print(body.decode("utf-8"))
             
-            if response.status_code == 200:
-                print(f"\n✅ SUCCESS - Response Body:")
-                try:
-                    result = response.json()
-                    print(json.dumps(result, indent=2))
-                    
-                    # Try to extract fraud probability
-                    if isinstance(result, dict):
-                        fraud_prob = (result.get('fraud_probability') or 
-                                    result.get('predictions', [{}])[0].get('fraud_probability') or
-                                    0)
-                        print(f"\n🎯 Fraud Probability Found: {fraud_prob:.4f} ({fraud_prob * 100:.2f}%)")
+            try:
+                status_code, headers, content = future.result()
+                
+                print(f"\n📥 Response Status: {status_code}")
+                print(f"📥 Response Headers: {headers}")
+                
+                if status_code == 200:
+                    print(f"\n✅ SUCCESS - Response Body:")
+                    try:
+                        result = loads(content)
+                        print(dumps_pretty(result))
+                        
+                        # Try to extract fraud probability
+                        if isinstance(result, dict):
+                            fraud_prob = (result.get('fraud_probability') or 
+                                        result.get('predictions', [{}])[0].get('fraud_probability') or
+                                        0)
+                            print(f"\n🎯 Fraud Probability Found: {fraud_prob:.4f} ({fraud_prob * 100:.2f}%)")
+                            
+                            if fraud_prob > 0:
+                                print("✅ Model is returning non-zero probabilities!")
+                                print("   This format works correctly!")
+                                return test['name']  # Return the working format
+                            else:
+                                print("⚠️ Probability is 0 - checking other formats...")
                         
-                        if fraud_prob > 0:
-                            print("✅ Model is returning non-zero probabilities!")
-                            print("   This format works correctly!")
-                            return test['name']  # Return the working format
-                        else:
-                            print("⚠️ Probability is 0 - trying next format...")
+                    except Exception as e:
+                        print(f"Raw response text: {content.decode('utf-8', 'replace')}")
+                        print(f"⚠️ Could not parse JSON: {e}")
+                else:
+                    print(f"\n❌ FAILED - Status {status_code}")
+                    print(f"Response: {content.decode('utf-8', 'replace')}")
                     
-                except Exception as e:
-                    print(f"Raw response text: {response.text}")
-                    print(f"⚠️ Could not parse JSON: {e}")
-            else:
-                print(f"\n❌ FAILED - Status {response.status_code}")
-                print(f"Response: {response.text}")
-                
-        except Exception as e:
-            print(f"\n❌ Request Failed:")
-            print(f"   {type(e).__name__}: {str(e)}")
+            except Exception as e:
+                print(f"\n❌ Request Failed:")
+                print(f"   {type(e).__name__}: {str(e)}")
+    finally:
+        # Let in-flight probes finish before their session and cache are closed
+        executor.shutdown(wait=True)
+        session.close()
+        cache.close()
     
     print("\n" + "=" * 80)
     print("📊 TEST COMPLETE")
@@ -163,4 +163,7 @@ def test_ml_endpoint():
     print("   to see what input format and feature names it expects.")
 
 if __name__ == "__main__":
-    test_ml_endpoint()
+    # Block-buffer stdout so the many progress prints are written in large chunks
+    sys.stdout.reconfigure(line_buffering=False)
+    # --no-cache always hits the live endpoint
+    test_ml_endpoint(use_cache="--no-cache" not in sys.argv)
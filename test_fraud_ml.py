@@ -1,110 +1,75 @@
 """
 Test script for Fraud Detection ML Model
 Demonstrates training and prediction capabilities
+
+Run in parallel with: pytest -n 4 test_fraud_*.py (needs pytest-xdist)
 """
 
-from fraud_ml_model import FraudMLModel
-from fraud_detection_agent import FraudDetectionAgent
-import json
+import sys
+import pytest
+from types import MappingProxyType
 
-print("="*80)
-print("🧪 FRAUD DETECTION ML MODEL TEST")
-print("="*80)
+def _scenario(name, claim_amount, claim_date, policy_limit, past_claims_amount,
+              claim_history_count, policy_expiry_date):
+    """Build one read-only test scenario in the claim/policy shape the model expects"""
+    return MappingProxyType({
+        "name": name,
+        "claim": MappingProxyType({
+            'claim_info': MappingProxyType({
+                'claim_amount': claim_amount,
+                'claim_date': claim_date
+            })
+        }),
+        "policy": MappingProxyType({
+            'validation': MappingProxyType({
+                'details': MappingProxyType({
+                    'policy_limit': policy_limit,
+                    'past_claims_amount': past_claims_amount,
+                    'claim_history_count': claim_history_count,
+                    'policy_expiry_date': policy_expiry_date
+                })
+            })
+        })
+    })
 
-# Initialize ML model
-print("\n1️⃣ Initializing ML Model...")
-ml_model = FraudMLModel()
 
-# Test scenarios
-test_scenarios = [
-    {
-        "name": "Legitimate Small Claim",
-        "claim": {
-            'claim_info': {
-                'claim_amount': 15000,
-                'claim_date': '2025-06-15'
-            }
-        },
-        "policy": {
-            'validation': {
-                'details': {
-                    'policy_limit': 200000,
-                    'past_claims_amount': 10000,
-                    'claim_history_count': 1,
-                    'policy_expiry_date': '2026-01-01'
-                }
-            }
-        }
-    },
-    {
-        "name": "Suspicious High-Limit Claim",
-        "claim": {
-            'claim_info': {
-                'claim_amount': 95000,
-                'claim_date': '2025-11-28'
-            }
-        },
-        "policy": {
-            'validation': {
-                'details': {
-                    'policy_limit': 100000,
-                    'past_claims_amount': 40000,
-                    'claim_history_count': 3,
-                    'policy_expiry_date': '2025-12-05'
-                }
-            }
-        }
-    },
-    {
-        "name": "Round Amount Near Expiry",
-        "claim": {
-            'claim_info': {
-                'claim_amount': 50000,
-                'claim_date': '2025-11-20'
-            }
-        },
-        "policy": {
-            'validation': {
-                'details': {
-                    'policy_limit': 150000,
-                    'past_claims_amount': 80000,
-                    'claim_history_count': 2,
-                    'policy_expiry_date': '2025-12-01'
-                }
-            }
-        }
-    },
-    {
-        "name": "Very High Value Claim",
-        "claim": {
-            'claim_info': {
-                'claim_amount': 180000,
-                'claim_date': '2025-11-15'
-            }
-        },
-        "policy": {
-            'validation': {
-                'details': {
-                    'policy_limit': 200000,
-                    'past_claims_amount': 50000,
-                    'claim_history_count': 4,
-                    'policy_expiry_date': '2025-11-25'
-                }
-            }
-        }
-    }
-]
+# Test scenarios (immutable, shared by reference across parametrized tests)
+TEST_SCENARIOS = (
+    _scenario("Legitimate Small Claim", 15000, '2025-06-15', 200000, 10000, 1, '2026-01-01'),
+    _scenario("Suspicious High-Limit Claim", 95000, '2025-11-28', 100000, 40000, 3, '2025-12-05'),
+    _scenario("Round Amount Near Expiry", 50000, '2025-11-20', 150000, 80000, 2, '2025-12-01'),
+    _scenario("Very High Value Claim", 180000, '2025-11-15', 200000, 50000, 4, '2025-11-25'),
+)
+
 
-print("\n2️⃣ Testing ML Predictions...\n")
+@pytest.fixture(scope="session")
+def ml_model_fixture():
+    """Load the ML model once for every parametrized scenario"""
+    # Imported here so test collection does not unpickle the model
+    FraudMLModel = pytest.importorskip("fraud_ml_model").FraudMLModel
+    print("\n1️⃣ Initializing ML Model...")
+    return FraudMLModel()
 
-for i, scenario in enumerate(test_scenarios, 1):
+
+@pytest.fixture(scope="session")
+def ml_results_fixture(ml_model_fixture):
+    """Score all scenarios in a single model call, keyed by scenario name"""
+    results = ml_model_fixture.predict_fraud_batch(
+        [s['claim'] for s in TEST_SCENARIOS],
+        [s['policy'] for s in TEST_SCENARIOS]
+    )
+    return {s['name']: r for s, r in zip(TEST_SCENARIOS, results)}
+
+
+@pytest.mark.parametrize("scenario", TEST_SCENARIOS, ids=lambda s: s["name"])
+def test_fraud_predict(scenario, ml_results_fixture):
+    """ML model prediction for one scenario"""
+    ml_result = ml_results_fixture[scenario['name']]
+    
     print(f"\n{'='*80}")
-    print(f"📋 Test Case {i}: {scenario['name']}")
+    print(f"📋 Test Case: {scenario['name']}")
     print(f"{'='*80}")
     
-    # ML Model Prediction
-    ml_result = ml_model.predict_fraud(scenario['claim'], scenario['policy'])
-    
     print(f"\n🤖 ML Model Results:")
     print(f"   Fraud Probability: {ml_result['ml_fraud_probability']:.2%}")
     print(f"   Risk Score: {ml_result['ml_risk_score']}/100")
@@ -122,15 +87,24 @@ for i, scenario in enumerate(test_scenarios, 1):
         )[:3]
         for feature, importance in sorted_features:
             print(f"      • {feature}: {importance:.3f}")
+    
+    assert ml_result['ml_prediction'] in ("FRAUD", "LEGITIMATE")
+    assert 0.0 <= ml_result['ml_fraud_probability'] <= 1.0
 
-# Test with Full Fraud Detection Agent (includes ML + Rules + AI)
-print(f"\n\n{'='*80}")
-print("3️⃣ Testing Full Fraud Detection Agent (ML + Rules + AI)")
-print(f"{'='*80}\n")
-
-fraud_agent = FraudDetectionAgent()
 
-if fraud_agent.enabled and fraud_agent.ml_enabled:
+def test_hybrid_fraud_agent():
+    """Full Fraud Detection Agent (includes ML + Rules + AI)"""
+    FraudDetectionAgent = pytest.importorskip("fraud_detection_agent").FraudDetectionAgent
+    
+    print(f"\n\n{'='*80}")
+    print("3️⃣ Testing Full Fraud Detection Agent (ML + Rules + AI)")
+    print(f"{'='*80}\n")
+    
+    fraud_agent = FraudDetectionAgent()
+    
+    if not (fraud_agent.enabled and fraud_agent.ml_enabled):
+        pytest.skip("Fraud Agent or ML Model not fully initialized")
+    
     print("✅ Fraud Agent initialized with ML model\n")
     
     # Test with suspicious case
@@ -173,23 +147,25 @@ if fraud_agent.enabled and fraud_agent.ml_enabled:
         print(f"\n   📊 Fraud Indicators:")
         for ind in full_result['fraud_indicators']:
             print(f"      • [{ind['severity']}] {ind['indicator']}: {ind['description']}")
-    
-else:
-    print("⚠️ Fraud Agent or ML Model not fully initialized")
 
-print(f"\n{'='*80}")
-print("✅ Testing Complete!")
-print(f"{'='*80}\n")
 
-# Summary
-print("\n📝 Summary:")
-print("   • ML model trained with synthetic data (1000 samples)")
-print("   • 10 engineered features for fraud prediction")
-print("   • Random Forest classifier with 100 trees")
-print("   • Combines Rule-based + ML + AI for comprehensive detection")
-print("   • Model saved to: models/fraud_model.pkl")
-print("\n💡 Next Steps:")
-print("   • Replace synthetic data with real historical fraud data")
-print("   • Retrain model periodically with new fraud patterns")
-print("   • Monitor false positive/negative rates")
-print("   • Integrate into workflow_visualizer.py for live detection")
+if __name__ == "__main__":
+    print("="*80)
+    print("🧪 FRAUD DETECTION ML MODEL TEST")
+    print("="*80)
+    
+    exit_code = pytest.main([__file__, "-s", "-q"])
+    
+    # Summary
+    print("\n📝 Summary:")
+    print("   • ML model trained with synthetic data (1000 samples)")
+    print("   • 10 engineered features for fraud prediction")
+    print("   • Random Forest classifier with 100 trees")
+    print("   • Combines Rule-based + ML + AI for comprehensive detection")
+    print("   • Model saved to: models/fraud_model.pkl")
+    print("\n💡 Next Steps:")
+    print("   • Replace synthetic data with real historical fraud data")
+    print("   • Retrain model periodically with new fraud patterns")
+    print("   • Monitor false positive/negative rates")
+    print("   • Integrate into workflow_visualizer.py for live detection")
+    sys.exit(exit_code)
@@ -3,12 +3,17 @@ Test script to verify Azure ML Fraud Detection Model is working correctly
 Tests with various parameter combinations to validate model responses
 """
 
-import json
-from fraud_detector_agent import FraudDetectorAgent
+import sys
+import pytest
+from response_cache import ResponseCache
+from json_utils import dumps_body, dumps_pretty, loads
 import requests
 
-def test_fraud_model():
+
+def test_fraud_model(use_cache=True, as_json=False):
     """Test fraud detection model with different scenarios"""
+    # Imported here so test collection does not build the agent's dependencies
+    FraudDetectorAgent = pytest.importorskip("fraud_detector_agent").FraudDetectorAgent
     
     print("=" * 80)
     print("🧪 FRAUD DETECTION MODEL TEST")
@@ -103,6 +108,19 @@ def test_fraud_model():
         }
     ]
     
+    # Successful results are cached locally so reruns skip the endpoint
+    cache = ResponseCache(enabled=use_cache)
+    
+    def detect(data):
+        key = ResponseCache.make_key(fraud_agent.scoring_uri, data)
+        cached = cache.get(key)
+        if cached is not None:
+            return loads(cached)
+        result = fraud_agent.detect_fraud(data)
+        if result.get('success'):
+            cache.set(key, dumps_body(result))
+        return result
+    
     # Run tests
     results_summary = []
     
@@ -113,14 +131,14 @@ def test_fraud_model():
         print(f"{'=' * 80}")
         
         print("\n📊 Input Parameters:")
-        print(json.dumps(scenario['data'], indent=2))
+        print(dumps_pretty(scenario['data']))
         
         try:
             # Call fraud detection
-            result = fraud_agent.detect_fraud(scenario['data'])
+            result = detect(scenario['data'])
             
             print("\n📈 Fraud Detection Result:")
-            print(json.dumps(result, indent=2))
+            print(dumps_pretty(result))
             
             # Extract key metrics
             if result.get('success'):
@@ -163,6 +181,8 @@ def test_fraud_model():
                 "error": str(e)
             })
     
+    cache.close()
+    
     # Final Summary
     print("\n" + "=" * 80)
     print("📊 FINAL TEST SUMMARY")
@@ -177,23 +197,25 @@ def test_fraud_model():
     print(f"Success Rate: {(successful_tests / total_tests) * 100:.1f}%")
     
     print("\n📋 Results Table:")
-    print(f"{'Scenario':<30} {'Status':<12} {'Fraud Prob':<15} {'Risk Level':<15} {'Is Fraud':<10}")
-    print("-" * 95)
-    
+    row_fmt = "{:<30} {:<12} {:<15} {:<15} {:<10}"
+    rows = [row_fmt.format('Scenario', 'Status', 'Fraud Prob', 'Risk Level', 'Is Fraud'), "-" * 95]
     for result in results_summary:
-        scenario = result['scenario'][:28]
         if result['success']:
-            status = "✅ SUCCESS"
-            fraud_prob = f"{result['fraud_prob']:.4f}"
-            risk = result['risk']
-            is_fraud = "⚠️ YES" if result['is_fraud'] else "✅ NO"
+            rows.append(row_fmt.format(
+                result['scenario'][:28],
+                "✅ SUCCESS",
+                f"{result['fraud_prob']:.4f}",
+                result['risk'],
+                "⚠️ YES" if result['is_fraud'] else "✅ NO"
+            ))
         else:
-            status = "❌ FAILED"
-            fraud_prob = "N/A"
-            risk = "N/A"
-            is_fraud = "N/A"
-        
-        print(f"{scenario:<30} {status:<12} {fraud_prob:<15} {risk:<15} {is_fraud:<10}")
+            rows.append(row_fmt.format(result['scenario'][:28], "❌ FAILED", "N/A", "N/A", "N/A"))
+    sys.stdout.write("\n".join(rows) + "\n")
+    
+    if as_json:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(dumps_body(results_summary) + b"\n")
+        sys.stdout.buffer.flush()
     
     # Recommendations
     print("\n" + "=" * 80)
@@ -229,4 +251,5 @@ def test_fraud_model():
 
 
 if __name__ == "__main__":
-    test_fraud_model()
+    # --no-cache always hits the live endpoint; --json also dumps the raw results
+    test_fraud_model(use_cache="--no-cache" not in sys.argv, as_json="--json" in sys.argv)
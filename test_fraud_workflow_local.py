@@ -4,8 +4,21 @@ This tests the exact flow without running Streamlit
 """
 
 import sys
-import json
+from collections import defaultdict
 from datetime import datetime
+from operator import itemgetter
+
+from json_utils import loads
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; fall back to a full load
+    ijson = None
+
+try:
+    import jmespath
+except ImportError:  # jmespath is optional; fall back to plain dict checks
+    jmespath = None
 
 print("=" * 80)
 print("TESTING FRAUD DETECTION → HUMAN REVIEW WORKFLOW LOCALLY")
@@ -14,21 +27,38 @@ print("=" * 80)
 # Simulate session state
 session_state = {}
 
+def _has_fraud_structure(review):
+    """True if the review has fraud analysis and extracted claim data"""
+    return bool(review.get('analysis_result', {}).get('fraud_analysis') and
+                review.get('claim_data', {}).get('extracted_data'))
+
+# Structural check for a usable fraud review, compiled once
+if jmespath is not None:
+    _FRAUD_REVIEW_PRED = jmespath.compile(
+        'analysis_result.fraud_analysis && claim_data.extracted_data'
+    ).search
+else:
+    _FRAUD_REVIEW_PRED = _has_fraud_structure
+
+def iter_reviews(path):
+    """Yield reviews from the queue file, streaming with ijson when available"""
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            # use_float keeps numbers as float instead of Decimal, matching json.load
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        with open(path, 'rb') as f:
+            yield from loads(f.read())
+
 def simulate_fraud_detection():
     """Simulate what happens in workflow_visualizer.py lines 2073-2083"""
     print("\n📋 Step 1: Loading fraud case from review_queue.json...")
     
-    with open('review_queue.json', 'r', encoding='utf-8') as f:
-        reviews = json.load(f)
-    
     # Find a fraud case with proper structure
-    fraud_review = None
-    for review in reviews:
-        if ('analysis_result' in review and 
-            'fraud_analysis' in review.get('analysis_result', {}) and
-            'extracted_data' in review.get('claim_data', {})):
-            fraud_review = review
-            break
+    fraud_review = next(
+        (r for r in iter_reviews('review_queue.json') if _FRAUD_REVIEW_PRED(r)),
+        None
+    )
     
     if not fraud_review:
         print("   ❌ No valid fraud review found with proper structure!")
@@ -78,6 +108,10 @@ def simulate_tab_switch():
     print(f"   ℹ️  Session state persists across reruns")
     print(f"   ✓ session_state keys: {list(session_state.keys())}")
 
+# Display fields read from claim_info in one call; missing keys show as 'N/A'
+_get_claim_fields = itemgetter('policy_number', 'policyholder_name', 'driver_rating',
+                               'age', 'police_report_filed')
+
 def test_human_review_ui():
     """Test if Human Review UI can access the data"""
     print("\n👤 Step 4: Testing Human Review UI logic...")
@@ -91,15 +125,20 @@ def test_human_review_ui():
         extracted_data = fraud_claim.get('extracted_data', {})
         claim_info = extracted_data.get('claim_info', {})
         
+        pol, name, rating, age, police_report = _get_claim_fields(
+            defaultdict(lambda: 'N/A', claim_info)
+        )
+        amount = claim_info.get('claim_amount', 0)
+        
         print("\n   📊 Testing data extraction for UI display:")
-        print(f"      - Policy Number: {claim_info.get('policy_number', 'N/A')}")
-        print(f"      - Policyholder: {claim_info.get('policyholder_name', 'N/A')}")
-        print(f"      - Claim Amount: ${claim_info.get('claim_amount', 0):,.2f}")
+        print(f"      - Policy Number: {pol}")
+        print(f"      - Policyholder: {name}")
+        print(f"      - Claim Amount: ${amount:,.2f}")
         print(f"      - Fraud Probability: {fraud_claim['fraud_probability']:.2%}")
         print(f"      - Risk Level: {fraud_claim['fraud_risk']}")
-        print(f"      - Driver Rating: {claim_info.get('driver_rating', 'N/A')}")
-        print(f"      - Age: {claim_info.get('age', 'N/A')}")
-        print(f"      - Police Report: {claim_info.get('police_report_filed', 'N/A')}")
+        print(f"      - Driver Rating: {rating}")
+        print(f"      - Age: {age}")
+        print(f"      - Police Report: {police_report}")
         
         # Verify all required keys exist
         required_keys = ['policy_number', 'fraud_probability', 'fraud_risk', 
@@ -197,5 +236,7 @@ def main():
         return False
 
 if __name__ == "__main__":
+    # Block-buffer stdout so the many progress prints are written in large chunks
+    sys.stdout.reconfigure(line_buffering=False)
     success = main()
     sys.exit(0 if success else 1)
@@ -4,7 +4,7 @@ import time
 print("Testing ML Model with Updated Credentials...")
 print("="*70)
 
-agent = FraudDetectorAgent()
+agent = FraudDetectorAgent(warm_up=False)
 
 test_data = {
     'DriverRating': 1,
@@ -18,13 +18,30 @@ test_data = {
     'Deductible': 500
 }
 
+# First call pays endpoint cold start + TLS handshake; time it separately
+start = time.time()
+agent.warm_up()
+cold = time.time() - start
+
 start = time.time()
 result = agent.detect_fraud(test_data)
 elapsed = time.time() - start
 
+print(f"⏱️  Warm-up (cold) Time: {cold:.3f}s")
 print(f"⏱️  Response Time: {elapsed:.3f}s")
 print(f"✅ Success: {result['success']}")
 print(f"🚨 Fraud Detected: {result.get('is_fraud', False)}")
 print(f"📊 Fraud Probability: {result.get('fraud_probability', 0):.2%}")
 print(f"⚠️  Risk Level: {result.get('fraud_risk', 'Unknown')}")
 print(f"🤖 Status: {'ONLINE' if result['success'] else 'OFFLINE - ' + result.get('error', 'Unknown')}")
+
+# Batched scoring: several claims in one Azure ML request
+claims = [dict(test_data, Age=age) for age in (22, 30, 45, 60)]
+
+start = time.time()
+results = agent.detect_fraud_many(claims)
+elapsed = time.time() - start
+
+print(f"\n⏱️  Batch Response Time ({len(claims)} claims, 1 request): {elapsed:.3f}s")
+for claim, res in zip(claims, results):
+    print(f"   Age {claim['Age']}: {res.get('fraud_probability', 0):.2%} - {res.get('fraud_risk', 'Unknown')}")
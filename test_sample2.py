@@ -1,11 +1,12 @@
 """
 Test Azure ML endpoint with exact Sample 2 values
 """
-import requests
-import json
 import os
 from dotenv import load_dotenv
 
+from http_session import create_endpoint_session
+from json_utils import dumps_body, dumps_pretty, loads
+
 load_dotenv()
 
 # Sample 2 exact values
@@ -27,23 +28,23 @@ print(f"Input: {data}")
 endpoint = os.getenv('AZURL_ML_ENDPOINT')
 api_key = os.getenv('AZURE_ML_API_KEY')
 
-response = requests.post(
+# Pooled keep-alive session; key header if set, otherwise one cached AAD token
+SESSION = create_endpoint_session(api_key)
+
+response = SESSION.post(
     endpoint,
-    data=json.dumps(data),
-    headers={
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {api_key}'
-    },
+    data=dumps_body(data),
     timeout=30
 )
 
 print(f"\nStatus Code: {response.status_code}")
 
 if response.status_code == 200:
-    result = response.json()
-    if isinstance(result, str):
-        result = json.loads(result)
-    print(f"Result: {json.dumps(result, indent=2)}")
+    result = loads(response.content)
+    # Deployments older than the dict-returning scoring.py double-encode JSON
+    if isinstance(result, (bytes, str)):
+        result = loads(result)
+    print(f"Result: {dumps_pretty(result)}")
     
     if 'predictions' in result:
         pred = result['predictions'][0]
@@ -6,8 +6,23 @@ This simulates what happens when:
 3. User switches to Human Review tab
 """
 
-import json
-from datetime import datetime
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from json_utils import dumps_body, loads
+
+
+@dataclass(slots=True)
+class FraudReview:
+    """fraud_claim_for_review as built by workflow_visualizer.py for the Human Review tab"""
+    policy_number: str
+    decision: str
+    fraud_probability: float
+    fraud_risk: str
+    threshold: float
+    extracted_data: dict
+    fraud_analysis: dict
+    eligibility_analysis: dict
 
 # Simulate the workflow
 print("=" * 60)
@@ -16,8 +31,8 @@ print("=" * 60)
 
 # Step 1: Load a real fraud case from review_queue.json
 print("\n1. Loading fraud case from review_queue.json...")
-with open('review_queue.json', 'r', encoding='utf-8') as f:
-    reviews = json.load(f)
+raw = Path('review_queue.json').read_bytes()
+reviews = loads(raw)
 
 if reviews:
     review = reviews[0]  # Get first pending review
@@ -27,27 +42,37 @@ if reviews:
     
     # Step 2: Simulate what workflow_visualizer.py does at line 2073
     print("\n2. Simulating fraud_claim_for_review creation (lines 2073-2083)...")
-    fraud_claim_for_review = {
-        'policy_number': review['claim_data']['extracted_data']['claim_info']['policy_number'],
-        'decision': 'FRAUD_DETECTED',
-        'fraud_probability': review['analysis_result']['fraud_analysis']['fraud_probability'],
-        'fraud_risk': review['analysis_result']['fraud_analysis']['fraud_risk'],
-        'threshold': review['analysis_result']['fraud_analysis'].get('threshold_used', 0.65),
-        'extracted_data': review['claim_data']['extracted_data'],
-        'fraud_analysis': review['analysis_result']['fraud_analysis'],
-        'eligibility_analysis': review['analysis_result'].get('eligibility_analysis', {})
-    }
+    analysis_result = review['analysis_result']
+    fraud_analysis = analysis_result['fraud_analysis']
+    extracted_data = review['claim_data']['extracted_data']
+    fraud_claim_for_review = FraudReview(
+        policy_number=extracted_data['claim_info']['policy_number'],
+        decision='FRAUD_DETECTED',
+        fraud_probability=fraud_analysis['fraud_probability'],
+        fraud_risk=fraud_analysis['fraud_risk'],
+        threshold=fraud_analysis.get('threshold_used', 0.65),
+        extracted_data=extracted_data,
+        fraud_analysis=fraud_analysis,
+        eligibility_analysis=analysis_result.get('eligibility_analysis', {})
+    )
     
     print(f"   ✓ fraud_claim_for_review created with:")
-    print(f"      - policy_number: {fraud_claim_for_review['policy_number']}")
-    print(f"      - fraud_probability: {fraud_claim_for_review['fraud_probability']}")
-    print(f"      - fraud_risk: {fraud_claim_for_review['fraud_risk']}")
+    print(f"      - policy_number: {fraud_claim_for_review.policy_number}")
+    print(f"      - fraud_probability: {fraud_claim_for_review.fraud_probability}")
+    print(f"      - fraud_risk: {fraud_claim_for_review.fraud_risk}")
     
     # Step 3: Verify the data structure matches what human_review_agent.py expects
     print("\n3. Verifying data structure for human_review_agent.py...")
     
+    # Session state payload as the Human Review tab would receive it
+    payload = dumps_body(asdict(fraud_claim_for_review))
+    print(f"   ✓ Serialized fraud_claim_for_review: {len(payload)} bytes")
+    
+    # Check the round-tripped payload, not the dataclass schema: a value the
+    # review record lacked (None) is as broken for the tab as a missing key
+    session_state = loads(payload)
     required_keys = ['policy_number', 'decision', 'fraud_probability', 'fraud_risk', 'threshold', 'extracted_data', 'fraud_analysis']
-    missing_keys = [key for key in required_keys if key not in fraud_claim_for_review]
+    missing_keys = [key for key in required_keys if session_state.get(key) is None]
     
     if missing_keys:
         print(f"   ✗ MISSING KEYS: {missing_keys}")
@@ -56,7 +81,7 @@ if reviews:
     
     # Step 4: Check extracted_data structure
     print("\n4. Checking extracted_data structure...")
-    extracted_data = fraud_claim_for_review.get('extracted_data', {})
+    extracted_data = fraud_claim_for_review.extracted_data or {}
     claim_info = extracted_data.get('claim_info', {})
     
     print(f"   ✓ extracted_data keys: {list(extracted_data.keys())}")
@@ -69,7 +94,7 @@ if reviews:
     
     # Step 5: Verify fraud_analysis structure
     print("\n5. Checking fraud_analysis structure...")
-    fraud_analysis = fraud_claim_for_review.get('fraud_analysis', {})
+    fraud_analysis = fraud_claim_for_review.fraud_analysis or {}
     print(f"   ✓ fraud_analysis keys: {list(fraud_analysis.keys())}")
     
     fraud_indicators = fraud_analysis.get('fraud_indicators', {})
@@ -4,7 +4,20 @@ Test specific claim data through fraud detector agent
 import sys
 sys.path.append('c:/Projects/DEMO')
 
-from fraud_detector_agent import FraudDetectorAgent
+from fraud_detector_agent import CATEGORY_MAPS, FraudDetectorAgent
+
+# Integer code → label, inverted from the agent's own label → code maps
+CODE_LABELS = {
+    field: {code: label for label, code in mapping.items()}
+    for field, mapping in CATEGORY_MAPS.items()
+}
+# Label shown for a code the maps do not know
+LABEL_DEFAULTS = {
+    "AccidentArea": "Urban",
+    "Sex": "Male",
+    "PolicyType": "Sedan - Collision",
+    "PoliceReportFiled": "No"
+}
 
 # Initialize agent
 agent = FraudDetectorAgent()
@@ -34,20 +47,10 @@ print("CONVERTING TO STRINGS FOR AZURE ML")
 print("=" * 80)
 
 # Show what will be sent
-accident_area_map = {0: "Rural", 1: "Urban"}
-sex_map = {0: "Female", 1: "Male"}
-policy_type_map = {
-    0: "Sedan - All Perils",
-    1: "Sedan - Collision", 
-    2: "Sedan - Liability"
-}
-police_report_map = {0: "No", 1: "Yes"}
-
 print("\nConverted values:")
-print(f"  AccidentArea: {claim_data['AccidentArea']} → {accident_area_map.get(claim_data['AccidentArea'], 'Urban')}")
-print(f"  Sex: {claim_data['Sex']} → {sex_map.get(claim_data['Sex'], 'Male')}")
-print(f"  PolicyType: {claim_data['PolicyType']} → {policy_type_map.get(claim_data['PolicyType'], 'Sedan - Collision')}")
-print(f"  PoliceReportFiled: {claim_data['PoliceReportFiled']} → {police_report_map.get(claim_data['PoliceReportFiled'], 'No')}")
+for field, labels in CODE_LABELS.items():
+    code = claim_data[field]
+    print(f"  {field}: {code} → {labels.get(code, LABEL_DEFAULTS[field])}")
 
 print("\n" + "=" * 80)
 print("CALLING AZURE ML")
@@ -68,3 +71,16 @@ else:
     print(f"\n✅ NO FRAUD - Probability {result.get('fraud_probability', 0) * 100:.1f}% below threshold")
 
 print("\n" + "=" * 80)
+
+# Same claim with and without a police report, scored in one request
+print("BATCH CHECK (detect_fraud_many)")
+print("=" * 80)
+variants = [claim_data, dict(claim_data, PoliceReportFiled=1)]
+report_labels = [
+    CODE_LABELS["PoliceReportFiled"].get(v["PoliceReportFiled"], LABEL_DEFAULTS["PoliceReportFiled"])
+    for v in variants
+]
+for label, res in zip(report_labels, agent.detect_fraud_many(variants)):
+    print(f"  PoliceReportFiled={label}: "
+          f"{res.get('fraud_probability', 0) * 100:.1f}% - {res.get('fraud_risk', 'Unknown')}")
+print("=" * 80)
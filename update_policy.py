@@ -1,28 +1,25 @@
-from azure_sql_agent import get_azure_sql_agent
+from sql_connection import get_conn
+from azure_sql_agent import invalidate_cached_policy
 
-agent = get_azure_sql_agent()
-if agent.connect():
-    cursor = agent.connection.cursor()
+try:
+    conn = get_conn()
+    cursor = conn.cursor()
     
-    # Show before update
-    cursor.execute("SELECT policy_number, policy_limit FROM policy_data WHERE policy_number = 'POL90927'")
-    before = cursor.fetchone()
-    print(f"\nBEFORE: Policy {before[0]} - Limit: {before[1]}")
-    
-    # Update the policy limit
+    # Update and read back old/new values in one round-trip
     cursor.execute("""
         UPDATE policy_data 
-        SET policy_limit = 527000 
-        WHERE policy_number = 'POL90927'
-    """)
-    agent.connection.commit()
+        SET policy_limit = ? 
+        OUTPUT inserted.policy_number, deleted.policy_limit, inserted.policy_limit
+        WHERE policy_number = ?
+    """, 527000, 'POL90927')
+    policy_number, before, after = cursor.fetchone()
+    conn.commit()
+    invalidate_cached_policy(policy_number)
     
-    # Show after update
-    cursor.execute("SELECT policy_number, policy_limit FROM policy_data WHERE policy_number = 'POL90927'")
-    after = cursor.fetchone()
-    print(f"AFTER:  Policy {after[0]} - Limit: {after[1]}")
-    print(f"\n✅ Successfully updated policy limit from {before[1]} to {after[1]}")
+    print(f"\nBEFORE: Policy {policy_number} - Limit: {before}")
+    print(f"AFTER:  Policy {policy_number} - Limit: {after}")
+    print(f"\n✅ Successfully updated policy limit from {before} to {after}")
     
     cursor.close()
-else:
-    print("Failed to connect to database")
+except Exception as e:
+    print(f"❌ Error updating policy: {e}")
@@ -1,44 +1,26 @@
-import pyodbc
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-server = os.getenv('AZURE_SQL_SERVER')
-database = os.getenv('AZURE_SQL_DATABASE')
-username = os.getenv('AZURE_SQL_USERNAME')
-password = os.getenv('AZURE_SQL_PASSWORD')
-
-connection_string = (
-    f"DRIVER={{SQL Server}};"
-    f"SERVER={server};"
-    f"DATABASE={database};"
-    f"UID={username};"
-    f"PWD={password};"
-    f"Encrypt=yes;"
-    f"TrustServerCertificate=yes;"
-)
+from sql_connection import get_conn
+from azure_sql_agent import invalidate_cached_policy
 
 try:
-    conn = pyodbc.connect(connection_string)
+    # Fail fast if a fresh connection is needed and the server is unreachable
+    conn = get_conn(login_timeout=5)
     cursor = conn.cursor()
     
-    # Show before
-    cursor.execute("SELECT policy_number, policy_limit FROM policy_data WHERE policy_number = 'POL90927'")
-    before = cursor.fetchone()
-    print(f"\nBEFORE: Policy {before[0]} - Limit: ${before[1]:,}")
-    
-    # Update
-    cursor.execute("UPDATE policy_data SET policy_limit = 527000 WHERE policy_number = 'POL90927'")
+    # Update and read back old/new values in one round-trip
+    cursor.execute(
+        "UPDATE policy_data SET policy_limit = ? "
+        "OUTPUT inserted.policy_number, deleted.policy_limit, inserted.policy_limit "
+        "WHERE policy_number = ?",
+        527000, 'POL90927'
+    )
+    policy_number, before, after = cursor.fetchone()
     conn.commit()
+    invalidate_cached_policy(policy_number)
     
-    # Show after
-    cursor.execute("SELECT policy_number, policy_limit FROM policy_data WHERE policy_number = 'POL90927'")
-    after = cursor.fetchone()
-    print(f"AFTER:  Policy {after[0]} - Limit: ${after[1]:,}")
-    print(f"\n✅ Successfully updated! Changed from ${before[1]:,} to ${after[1]:,}")
+    print(f"\nBEFORE: Policy {policy_number} - Limit: ${before:,}")
+    print(f"AFTER:  Policy {policy_number} - Limit: ${after:,}")
+    print(f"\n✅ Successfully updated! Changed from ${before:,} to ${after:,}")
     
     cursor.close()
-    conn.close()
 except Exception as e:
     print(f"❌ Error: {e}")
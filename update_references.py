@@ -1,8 +1,11 @@
+import os
 import re
+from pathlib import Path
 
-# Read the file
-with open('workflow_visualizer.py', 'r', encoding='utf-8') as f:
-    content = f.read()
+TARGET = 'workflow_visualizer.py'
+
+# The substitution rebuilds the whole text anyway, so a plain read is enough
+content = Path(TARGET).read_text(encoding='utf-8')
 
 # Replace all Databricks UI references
 replacements = [
@@ -15,11 +18,24 @@ replacements = [
     (r'"database": "Databricks"', '"database": "Azure SQL"'),
 ]
 
-for pattern, replacement in replacements:
-    content = re.sub(pattern, replacement, content)
+# One alternation of named groups so the file is scanned once, not once per pattern
+PATTERN = re.compile(
+    '|'.join(f'(?P<g{i}>{pattern})' for i, (pattern, _) in enumerate(replacements))
+)
+REPL = {f'g{i}': replacement for i, (_, replacement) in enumerate(replacements)}
+
+
+def _dispatch(match):
+    return REPL[match.lastgroup]
+
+
+content = PATTERN.sub(_dispatch, content)
 
-# Write back
-with open('workflow_visualizer.py', 'w', encoding='utf-8') as f:
-    f.write(content)
+# Write to a temp file and swap it in atomically, so an interrupted run
+# never leaves a half-written workflow_visualizer.py behind
+tmp_path = TARGET + '.tmp'
+with open(tmp_path, 'wb') as f:
+    f.write(content.encode('utf-8'))
+os.replace(tmp_path, TARGET)
 
 print('✅ Updated all Databricks references to Azure SQL in workflow_visualizer.py')
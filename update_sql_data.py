@@ -2,36 +2,37 @@
 Script to update SQL Server with data from Policy_data.csv
 """
 
+import csv
 import os
-import pandas as pd
-import pyodbc
 from dotenv import load_dotenv
+from sql_connection import get_conn
 
 # Load environment variables
 load_dotenv()
 
+# Policy_data.csv columns in INSERT order, and rows sent per executemany call
+CSV_COLUMNS = ['policy_number', 'policyholder_Name', 'policyholder_id', 'claim_history_count',
+               'past_claims_amount', 'policy_status', 'policy_limit']
+BATCH_SIZE = 1000
+
+
+def _number(value, cast):
+    """Cast a numeric CSV cell, mapping an empty cell to NULL instead of failing the batch"""
+    value = value.strip()
+    return cast(value) if value else None
+
+
 # Get database connection details
 server = os.getenv("AZURE_SQL_SERVER")
 database = os.getenv("AZURE_SQL_DATABASE")
-username = os.getenv("AZURE_SQL_USERNAME")
-password = os.getenv("AZURE_SQL_PASSWORD")
 
 print(f"🔌 Connecting to SQL Server...")
 print(f"   Server: {server}")
 print(f"   Database: {database}")
 
-# Create connection string
-connection_string = (
-    f"DRIVER={{SQL Server}};"
-    f"SERVER={server};"
-    f"DATABASE={database};"
-    f"UID={username};"
-    f"PWD={password};"
-)
-
 try:
     # Connect to database
-    conn = pyodbc.connect(connection_string)
+    conn = get_conn()
     cursor = conn.cursor()
     print("✅ Connected to SQL Server successfully!")
     
@@ -47,11 +48,6 @@ try:
     for table in tables:
         print(f"   - {table[0]}")
     
-    # Read CSV file
-    print("\n📄 Reading Policy_data.csv...")
-    df = pd.read_csv('Policy_data.csv')
-    print(f"   Found {len(df)} records")
-    
     # Clear existing data (optional - comment out if you want to keep existing data)
     print("\n🗑️ Clearing existing policy data...")
     cursor.execute("DELETE FROM policy_data")
@@ -72,21 +68,35 @@ try:
     ) VALUES (?, ?, ?, ?, ?, ?, ?)
     """
     
+    # Stream the CSV straight into batched executemany calls; values are
+    # coerced inline so pandas is never needed
+    print("   Streaming Policy_data.csv...")
+    cursor.fast_executemany = True
     inserted_count = 0
-    for index, row in df.iterrows():
-        cursor.execute(
-            insert_query,
-            row['policy_number'],
-            row['policyholder_Name'],
-            row['policyholder_id'],
-            row['claim_history_count'],
-            row['past_claims_amount'],
-            row['policy_status'],
-            row['policy_limit']
-        )
-        inserted_count += 1
-        if inserted_count % 5 == 0:
-            print(f"   Inserted {inserted_count}/{len(df)} records...")
+    with open('Policy_data.csv', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        idx = [header.index(c) for c in CSV_COLUMNS]
+        
+        buf = []
+        for row in reader:
+            buf.append((
+                row[idx[0]],
+                row[idx[1]],
+                row[idx[2]],
+                _number(row[idx[3]], int),
+                _number(row[idx[4]], float),
+                row[idx[5]],
+                _number(row[idx[6]], float)
+            ))
+            if len(buf) == BATCH_SIZE:
+                cursor.executemany(insert_query, buf)
+                inserted_count += len(buf)
+                print(f"   Inserted {inserted_count} records...")
+                buf.clear()
+        if buf:
+            cursor.executemany(insert_query, buf)
+            inserted_count += len(buf)
     
     conn.commit()
     print(f"✅ Successfully inserted {inserted_count} records!")
@@ -104,7 +114,6 @@ try:
         print(f"   {row[0]} | {row[1]} | {row[2]} | ${row[3]:,.0f}")
     
     cursor.close()
-    conn.close()
     print("\n🎉 Database update completed successfully!")
     
 except Exception as e:
@@ -1,86 +1,77 @@
-import pyodbc
 import pandas as pd
 from dotenv import load_dotenv
-import os
+from urllib.parse import quote_plus
+from sqlalchemy import create_engine
+from sql_connection import build_connection_string
+
+try:
+    import pyarrow.csv as pv
+except ImportError:  # pyarrow is optional; fall back to pandas
+    pv = None
 
 # Load environment variables
 load_dotenv()
 
-# Database connection details
-server = os.getenv('AZURE_SQL_SERVER')
-database = os.getenv('AZURE_SQL_DATABASE')
-username = os.getenv('AZURE_SQL_USERNAME')
-password = os.getenv('AZURE_SQL_PASSWORD')
-
 # Read CSV file
 csv_file = r'C:\Projects\DEMO\Policy_data.csv'
-df = pd.read_csv(csv_file)
+df = pv.read_csv(csv_file).to_pandas() if pv is not None else pd.read_csv(csv_file)
 
 print(f"Found {len(df)} records in CSV file")
 print(f"Columns: {list(df.columns)}")
 
-# Create connection string using SQL Server driver
-connection_string = (
-    f"DRIVER={{SQL Server}};"
-    f"SERVER={server};"
-    f"DATABASE={database};"
-    f"UID={username};"
-    f"PWD={password};"
-    f"Encrypt=yes;"
-    f"TrustServerCertificate=yes;"
+# Same ODBC Driver 18 settings as the other admin scripts
+connection_string = build_connection_string()
+
+print(f"Using driver: ODBC Driver 18 for SQL Server")
+
+# pandas needs a SQLAlchemy engine for to_sql; wrap the same ODBC connection string
+engine = create_engine(
+    f"mssql+pyodbc:///?odbc_connect={quote_plus(connection_string)}",
+    fast_executemany=True
 )
 
-print(f"Using driver: SQL Server")
+# SQL Server allows at most 2100 parameters per statement, so a multi-row
+# INSERT of 7 columns can carry at most 300 rows
+CHUNK_SIZE = 250
 
 try:
     # Connect to database
     print("\nConnecting to Azure SQL Database...")
-    conn = pyodbc.connect(connection_string)
-    cursor = conn.cursor()
+    existing = pd.read_sql("SELECT policy_number FROM policy_data", engine)['policy_number']
     print("Connected successfully!")
     
-    # Insert data
-    print(f"\nInserting {len(df)} records...")
-    inserted_count = 0
-    skipped_count = 0
+    # Drop duplicates (against the table and within the CSV) up front so
+    # the batched INSERTs never trip an IntegrityError
+    columns = ['policy_number', 'policyholder_Name', 'policyholder_id', 'claim_history_count',
+               'past_claims_amount', 'policy_status', 'policy_limit']
+    duplicate_mask = df['policy_number'].isin(existing) | df['policy_number'].duplicated()
+    for policy_number in df.loc[duplicate_mask, 'policy_number']:
+        print(f"Skipped duplicate: {policy_number}")
+    new_rows = df.loc[~duplicate_mask, columns]
+    skipped_count = int(duplicate_mask.sum())
     
-    for index, row in df.iterrows():
-        try:
-            cursor.execute("""
-                INSERT INTO policy_data 
-                (policy_number, policyholder_Name, policyholder_id, claim_history_count, 
-                 past_claims_amount, policy_status, policy_limit)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, 
-            row['policy_number'], 
-            row['policyholder_Name'], 
-            row['policyholder_id'], 
-            row['claim_history_count'], 
-            row['past_claims_amount'], 
-            row['policy_status'], 
-            row['policy_limit'])
-            inserted_count += 1
-        except pyodbc.IntegrityError:
-            # Skip duplicate policy numbers
-            skipped_count += 1
-            print(f"Skipped duplicate: {row['policy_number']}")
-        except Exception as e:
-            print(f"Error inserting {row['policy_number']}: {e}")
+    # Insert data as multi-row INSERT ... VALUES (...), (...) statements
+    print(f"\nInserting {len(new_rows)} records...")
+    new_rows.to_sql(
+        'policy_data',
+        engine,
+        if_exists='append',
+        index=False,
+        method='multi',
+        chunksize=CHUNK_SIZE
+    )
+    inserted_count = len(new_rows)
     
-    # Commit changes
-    conn.commit()
     print(f"\n✅ Upload complete!")
     print(f"   - Inserted: {inserted_count} records")
     print(f"   - Skipped: {skipped_count} duplicates")
     
     # Verify data
-    cursor.execute("SELECT COUNT(*) FROM policy_data")
-    total = cursor.fetchone()[0]
+    total = pd.read_sql("SELECT COUNT(*) AS total FROM policy_data", engine)['total'].iloc[0]
     print(f"   - Total records in database: {total}")
     
     # Close connection
-    cursor.close()
-    conn.close()
+    engine.dispose()
     print("\nConnection closed.")
 
 except Exception as e:
@@ -2,20 +2,24 @@
 Verify if the new model is actually deployed by checking response details
 """
 import os
-import json
-import requests
 from dotenv import load_dotenv
 
+from http_session import create_endpoint_session
+from json_utils import dumps_body, dumps_pretty, loads
+
 load_dotenv()
 
 AZURE_ML_ENDPOINT = os.getenv("AZURE_ML_ENDPOINT")
 AZURE_ML_API_KEY = os.getenv("AZURE_ML_API_KEY")
 
+# Pooled keep-alive session; key header if set, otherwise one cached AAD token
+SESSION = create_endpoint_session(AZURE_ML_API_KEY)
+
 print("=" * 80)
 print("DEPLOYMENT VERIFICATION TEST")
 print("=" * 80)
 print(f"Endpoint: {AZURE_ML_ENDPOINT}")
-print(f"API Key: {AZURE_ML_API_KEY[:20]}...")
+print(f"API Key: {AZURE_ML_API_KEY[:20]}..." if AZURE_ML_API_KEY else "Auth: Azure AD token (DefaultAzureCredential)")
 
 # Send a simple test to see if we get any deployment info
 test_data = {
@@ -31,15 +35,9 @@ test_data = {
 }
 
 try:
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {AZURE_ML_API_KEY}"
-    }
-    
-    response = requests.post(
+    response = SESSION.post(
         AZURE_ML_ENDPOINT,
-        headers=headers,
-        data=json.dumps(test_data),
+        data=dumps_body(test_data),
         timeout=60
     )
     
@@ -50,14 +48,14 @@ try:
             print(f"  {key}: {value}")
     
     if response.status_code == 200:
-        result = response.json()
+        result = loads(response.content)
         
-        # Handle double-encoded JSON
-        if isinstance(result, str):
-            result = json.loads(result)
+        # Deployments older than the dict-returning scoring.py double-encode JSON
+        if isinstance(result, (bytes, str)):
+            result = loads(result)
         
         print(f"\nFull Response:")
-        print(json.dumps(result, indent=2))
+        print(dumps_pretty(result))
         
         if "predictions" in result:
             pred = result["predictions"][0]
@@ -5,18 +5,27 @@ Preserves exact same UI as original workflow_visualizer.py
 """
 
 import streamlit as st
+import numpy as np
 import os
 import asyncio
+import hashlib
 import time
 import json
+import logging
+import re
+import shutil
+import tempfile
+import weakref
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Literal, Optional
 from dotenv import load_dotenv
+import httpx
+from pydantic import BaseModel
 
 # Agent Framework imports
 from agent_framework import (
-    ChatAgent,
-    ChatMessage,
     Executor,
     WorkflowBuilder,
     WorkflowContext,
@@ -25,193 +34,503 @@ from agent_framework import (
     ExecutorFailedEvent,
     handler,
 )
-from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import DefaultAzureCredential
+from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
 # Import your existing agents (they'll be wrapped as tools/executors)
 from azure_sql_agent import get_azure_sql_agent
-from fraud_detector_agent import FraudDetectorAgent
+from fraud_detector_agent import FraudDetectorAgent, encode_features
 from human_review_agent import HumanReviewAgent
-from audit_agent import get_audit_agent
+from audit_agent import get_audit_agent, get_buffered_audit_writer
+from response_cache import ResponseCache
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (and unavailable on Windows); keep the default loop
+    uvloop = None
 
 # Load environment variables
 load_dotenv()
 
+# Install before any workflow loop is created
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+logger = logging.getLogger(__name__)
+
+# Show session-state debug details in the sidebar
+APP_DEBUG = os.getenv("APP_DEBUG") == "1"
+
 # ============================================================================
 # WORKFLOW VISUALIZATION (Same as original)
 # ============================================================================
 
-def show_workflow_progress(step: int = 0):
-    """Display the workflow progress with all 8 agents"""
-    steps = [
-        {"num": 1, "name": "Orchestrator<br/>Agent", "icon": "🎯", "color": "#4F8EF7"},
-        {"num": 2, "name": "Document Reader<br/>Agent", "icon": "📄", "color": "#00C853"},
-        {"num": 3, "name": "Policy Validator<br/>Agent", "icon": "🗄️", "color": "#0078D4"},
-        {"num": 4, "name": "Eligibility<br/>Agent", "icon": "🔍", "color": "#9C27B0"},
-        {"num": 5, "name": "Fraud Detector<br/>Agent", "icon": "🚨", "color": "#E91E63"},
-        {"num": 6, "name": "Human Review<br/>Agent", "icon": "👤", "color": "#2196F3"},
-        {"num": 7, "name": "Communication<br/>Agent", "icon": "📧", "color": "#00BCD4"}
-    ]
-    
-    # Generate CSS and HTML (same as original)
-    css = """
-    <style>
-    .workflow-container {
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        padding: 20px;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 15px;
-        margin: 20px 0;
-    }
-    .agent-step {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        position: relative;
-        flex: 1;
-    }
-    .agent-icon {
-        width: 60px;
-        height: 60px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 28px;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .agent-step.active .agent-icon {
-        animation: pulse 1.5s infinite;
-        box-shadow: 0 0 20px rgba(255,255,255,0.5);
-    }
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.1); }
-    }
-    .agent-step.completed .agent-icon {
-        background: #4CAF50 !important;
-    }
-    .agent-step.inactive .agent-icon {
-        background: #9E9E9E;
-        opacity: 0.5;
-    }
-    .agent-label {
-        margin-top: 8px;
-        font-size: 11px;
-        font-weight: 600;
-        color: white;
-        text-align: center;
-        line-height: 1.2;
-    }
-    .step-number {
-        position: absolute;
-        top: -8px;
-        right: -8px;
-        background: white;
-        color: #333;
-        border-radius: 50%;
-        width: 24px;
-        height: 24px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 12px;
-        font-weight: bold;
-        border: 2px solid #667eea;
-    }
-    .connector {
-        flex: 0 0 40px;
-        height: 3px;
-        background: rgba(255,255,255,0.3);
-        position: relative;
-        top: -20px;
-    }
-    .connector.active {
-        background: white;
-        animation: flow 1s linear infinite;
-    }
-    @keyframes flow {
-        0% { opacity: 0.3; }
-        50% { opacity: 1; }
-        100% { opacity: 0.3; }
-    }
-    </style>
-    """
-    
-    html = css + '<div class="workflow-container">'
+WORKFLOW_STEPS = [
+    {"num": 1, "name": "Orchestrator<br/>Agent", "icon": "🎯", "color": "#4F8EF7"},
+    {"num": 2, "name": "Document Reader<br/>Agent", "icon": "📄", "color": "#00C853"},
+    {"num": 3, "name": "Policy Validator<br/>Agent", "icon": "🗄️", "color": "#0078D4"},
+    {"num": 4, "name": "Eligibility<br/>Agent", "icon": "🔍", "color": "#9C27B0"},
+    {"num": 5, "name": "Fraud Detector<br/>Agent", "icon": "🚨", "color": "#E91E63"},
+    {"num": 6, "name": "Human Review<br/>Agent", "icon": "👤", "color": "#2196F3"},
+    {"num": 7, "name": "Communication<br/>Agent", "icon": "📧", "color": "#00BCD4"}
+]
+
+# Generate CSS and HTML (same as original)
+_WORKFLOW_CSS = """
+<style>
+.workflow-container {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    padding: 20px;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    border-radius: 15px;
+    margin: 20px 0;
+}
+.agent-step {
+    display: flex;
+    flex-direction: column;
+    align-items: center;
+    position: relative;
+    flex: 1;
+}
+.agent-icon {
+    width: 60px;
+    height: 60px;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 28px;
+    transition: all 0.3s ease;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+}
+.agent-step.active .agent-icon {
+    animation: pulse 1.5s infinite;
+    box-shadow: 0 0 20px rgba(255,255,255,0.5);
+}
+@keyframes pulse {
+    0%, 100% { transform: scale(1); }
+    50% { transform: scale(1.1); }
+}
+.agent-step.completed .agent-icon {
+    background: #4CAF50 !important;
+}
+.agent-step.inactive .agent-icon {
+    background: #9E9E9E;
+    opacity: 0.5;
+}
+.agent-label {
+    margin-top: 8px;
+    font-size: 11px;
+    font-weight: 600;
+    color: white;
+    text-align: center;
+    line-height: 1.2;
+}
+.step-number {
+    position: absolute;
+    top: -8px;
+    right: -8px;
+    background: white;
+    color: #333;
+    border-radius: 50%;
+    width: 24px;
+    height: 24px;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 12px;
+    font-weight: bold;
+    border: 2px solid #667eea;
+}
+.connector {
+    flex: 0 0 40px;
+    height: 3px;
+    background: rgba(255,255,255,0.3);
+    position: relative;
+    top: -20px;
+}
+.connector.active {
+    background: white;
+    animation: flow 1s linear infinite;
+}
+@keyframes flow {
+    0% { opacity: 0.3; }
+    50% { opacity: 1; }
+    100% { opacity: 0.3; }
+}
+</style>
+"""
+
+
+def _build_workflow_template() -> str:
+    """Build the progress HTML once, leaving {status_N}/{bg_N}/{connector_N} slots per step"""
+    # Escape the CSS braces so only our slots are substituted by str.format
+    html = _WORKFLOW_CSS.replace('{', '{{').replace('}', '}}') + '<div class="workflow-container">'
     
-    for i, s in enumerate(steps):
-        status = "completed" if s["num"] < step else ("active" if s["num"] == step else "inactive")
-        icon_bg = s["color"] if status != "inactive" else "#9E9E9E"
-        
+    for i, s in enumerate(WORKFLOW_STEPS):
         html += f'''
-        <div class="agent-step {status}">
+        <div class="agent-step {{status_{i}}}">
             <div class="step-number">{s["num"]}</div>
-            <div class="agent-icon" style="background: {icon_bg};">{s["icon"]}</div>
+            <div class="agent-icon" style="background: {{bg_{i}}};">{s["icon"]}</div>
             <div class="agent-label">{s["name"]}</div>
         </div>
         '''
         
-        if i < len(steps) - 1:
-            connector_class = "active" if s["num"] < step else ""
-            html += f'<div class="connector {connector_class}"></div>'
+        if i < len(WORKFLOW_STEPS) - 1:
+            html += f'<div class="connector {{connector_{i}}}"></div>'
     
     html += '</div>'
-    st.markdown(html, unsafe_allow_html=True)
+    return html
+
+
+_WORKFLOW_TEMPLATE = _build_workflow_template()
+
+
+@st.cache_data(show_spinner=False)
+def render_workflow_html(step: int = 0) -> str:
+    """Fill the precomputed progress template for one step (cached per step)"""
+    slots = {}
+    for i, s in enumerate(WORKFLOW_STEPS):
+        status = "completed" if s["num"] < step else ("active" if s["num"] == step else "inactive")
+        slots[f"status_{i}"] = status
+        slots[f"bg_{i}"] = s["color"] if status != "inactive" else "#9E9E9E"
+        slots[f"connector_{i}"] = "active" if s["num"] < step else ""
+    return _WORKFLOW_TEMPLATE.format(**slots)
+
+
+def show_workflow_progress(step: int = 0):
+    """Display the workflow progress with all 8 agents"""
+    st.markdown(render_workflow_html(step), unsafe_allow_html=True)
+
+
+# Sidebar rows: (agent id, label, status lines shown while it is online)
+SIDEBAR_AGENTS = (
+    ("orchestrator", "**🎯 Orchestrator Agent**", ("✅ Workflow started", "📹 Initializing pipeline")),
+    ("document_reader", "**📄 Document Agent**", ("⚙️ Processing document", "🔍 Extracting data...")),
+    ("policy_validator", "**🗄️ Azure SQL Agent**", ("⚙️ Validating policy", "🔍 Querying database...")),
+    ("eligibility_agent", "**🔍 Eligibility Agent**", ("⚙️ Analyzing eligibility", "🧠 AI processing...")),
+    ("fraud_detector", "**🚨 Fraud Detection**", ("⚙️ Analyzing fraud risk", "🧠 ML model processing...")),
+    ("communication_agent", "**📧 Communication**", ("⚙️ Generating communication",)),
+    ("human_review", "**👤 Human Review**", ())
+)
+
+
+def _build_sidebar_templates() -> Dict[str, str]:
+    """Build the full "Current Status" sidebar markdown once per active agent"""
+    templates = {}
+    for active, _, _ in SIDEBAR_AGENTS:
+        rows = []
+        for agent_id, label, lines in SIDEBAR_AGENTS:
+            if agent_id == active:
+                rows.append("  \n".join((f"{label} 🟢 ONLINE",) + lines))
+            else:
+                rows.append(f"{label} 🔴 OFFLINE")
+        templates[active] = "### 📄 Current Status\n\n" + "\n\n---\n\n".join(rows)
+    return templates
+
+
+SIDEBAR_TEMPLATES = _build_sidebar_templates()
+
+
+class ThrottledRenderer:
+    """
+    Last-write-wins buffer for Streamlit placeholder updates
+    
+    Every markdown/progress write re-renders the component, so writes are
+    held per placeholder and flushed at most once per interval; frames
+    overwritten before a flush are dropped. Writes that land inside the
+    window are flushed by a trailing timer when it closes, so the panes do
+    not lag behind until the next event arrives.
+    """
+    
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self._pending = {}
+        self._last_flush = 0.0
+        self._trailing = None
+    
+    def update(self, placeholder, method: str, *args, **kwargs) -> None:
+        """Queue placeholder.method(*args, **kwargs), replacing any pending write to it"""
+        self._pending[id(placeholder)] = (placeholder, method, args, kwargs)
+        remaining = self.interval - (time.monotonic() - self._last_flush)
+        if remaining <= 0:
+            self.flush()
+        elif self._trailing is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:  # no loop: the next update or flush() applies it
+                return
+            self._trailing = loop.call_later(remaining, self.flush)
+    
+    def flush(self) -> None:
+        """Apply the pending writes now"""
+        if self._trailing is not None:
+            self._trailing.cancel()
+            self._trailing = None
+        for placeholder, method, args, kwargs in self._pending.values():
+            getattr(placeholder, method)(*args, **kwargs)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+
+
+async def drain_batches(stream, max_wait: float = 0.05, max_items: int = 64):
+    """
+    Regroup an async event stream into lists of events that arrive together
+    
+    Waits for one event, then keeps taking events that are already queued or
+    arrive within max_wait, up to max_items per batch.
+    
+    Args:
+        stream: Async iterable (e.g. workflow.run_stream(...))
+        max_wait: Seconds to wait for more events after the first one
+        max_items: Largest batch yielded
+    
+    Yields:
+        list: Events in arrival order
+    """
+    queue = asyncio.Queue()
+    end = object()
+    
+    async def pump():
+        try:
+            async for item in stream:
+                queue.put_nowait(item)
+        finally:
+            queue.put_nowait(end)
+    
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + max_wait
+            while len(batch) < max_items and batch[-1] is not end:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            
+            if batch[-1] is end:
+                if len(batch) > 1:
+                    yield batch[:-1]
+                # Re-raise anything the stream failed with
+                await task
+                return
+            yield batch
+    finally:
+        task.cancel()
+
+
+# ============================================================================
+# SHARED CLIENTS (built once per process / event loop)
+# ============================================================================
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+@st.cache_resource
+def get_fraud_detector_agent():
+    """Initialize Fraud Detector Agent once per app process (its endpoint warm-up starts here)"""
+    try:
+        return FraudDetectorAgent(warm_up=True)
+    except Exception as e:
+        st.error(f"Failed to initialize Fraud Detector Agent: {str(e)}")
+        return None
+
+
+EXTRACTION_CACHE_PATH = ".extraction_cache.sqlite"
+
+
+@lru_cache(maxsize=1)
+def get_extraction_cache() -> ResponseCache:
+    """Shared on-disk cache of document extractions keyed by PDF SHA-256"""
+    return ResponseCache(EXTRACTION_CACHE_PATH)
+
+
+PLAN_CACHE_PATH = ".plan_cache.sqlite"
+
+
+@lru_cache(maxsize=1)
+def get_plan_cache() -> ResponseCache:
+    """Shared on-disk cache of eligibility analyses and email templates"""
+    return ResponseCache(PLAN_CACHE_PATH)
+
+
+def claim_fingerprint(claim_info: Dict, policy_details: Dict) -> Optional[Dict]:
+    """
+    Eligibility prompt inputs of a claim, normalized for the plan cache
+    
+    Values are cast to str/float/int so SQL Decimal or date columns hash
+    cleanly, and the key covers every field the prompt carries, so a cached
+    analysis answers the same question.
+    
+    Args:
+        claim_info: Extracted claim fields
+        policy_details: Policy row from PolicyValidatorExecutor
+    
+    Returns:
+        dict: policy_number, claim_amount, policy_limit, policy_status and
+        claim_history_count, or None if a number cannot be parsed (skip the
+        plan cache)
+    """
+    try:
+        return {
+            "policy_number": str(claim_info.get("policy_number") or "").strip().upper(),
+            "claim_amount": float(claim_info.get("claim_amount") or 0),
+            "policy_limit": float(policy_details.get("policy_limit") or 0),
+            "policy_status": str(policy_details.get("policy_status") or "").strip(),
+            "claim_history_count": int(policy_details.get("claim_history_count") or 0)
+        }
+    except (TypeError, ValueError):
+        return None
+
+
+def _file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_credential() -> DefaultAzureCredential:
+    """Shared DefaultAzureCredential (slow to build, so only build it once)"""
+    return DefaultAzureCredential()
+
+
+def _loop_cached(factory):
+    """Cache factory() once per running event loop (async clients cannot cross loops)"""
+    instances = weakref.WeakKeyDictionary()
+    
+    @wraps(factory)
+    def getter():
+        loop = asyncio.get_running_loop()
+        if loop not in instances:
+            instances[loop] = factory()
+        return instances[loop]
+    
+    return getter
+
+
+def get_session_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop kept for the whole Streamlit session
+    
+    Claims run on it with run_until_complete() from the script thread, so
+    Streamlit calls keep their run context, while the _loop_cached clients
+    and workflow (and their open connections) survive from claim to claim.
+    """
+    loop = st.session_state.get("event_loop")
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        st.session_state["event_loop"] = loop
+    return loop
+
+
+@_loop_cached
+def get_http_client() -> httpx.AsyncClient:
+    """Shared HTTP/2 client; concurrent model calls multiplex over one connection"""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
+
+
+@_loop_cached
+def get_openai_client():
+    """Shared Azure OpenAI client on the HTTP/2 connection pool (API key, else Azure AD)"""
+    from openai import AsyncAzureOpenAI
+    
+    api_key = os.getenv("AZURE_AISERVICES_APIKEY")
+    return AsyncAzureOpenAI(
+        azure_endpoint=os.getenv("AZURE_AISERVICES_ENDPOINT"),
+        api_version="2024-10-21",
+        http_client=get_http_client(),
+        **({"api_key": api_key} if api_key else {
+            "azure_ad_token_provider": get_bearer_token_provider(get_credential(), COGNITIVE_SERVICES_SCOPE)
+        })
+    )
 
 
 # ============================================================================
 # AGENT EXECUTORS (Framework-based implementation)
 # ============================================================================
 
-class DocumentReaderExecutor(Executor):
-    """Extract data from uploaded PDF using Azure Document Intelligence"""
+# Document Intelligence key labels (lower-cased, no trailing colon) per claim field
+CLAIM_FIELD_ALIASES = {
+    "policy_number": ("policy number", "policy no", "policy #", "policy id"),
+    "policyholder_name": ("policyholder name", "policy holder name", "insured name", "name of insured"),
+    "claim_amount": ("claim amount", "amount claimed", "total claim amount", "claim value"),
+    "reason_for_claim": ("reason for claim", "claim reason", "cause of loss", "description of loss"),
+    "policy_type": ("policy type", "type of policy", "coverage type"),
+    "claim_date": ("claim date", "date of claim", "date claimed"),
+    "driver_rating": ("driver rating", "rating of driver"),
+    "age": ("age", "driver age", "age of driver", "age of policyholder"),
+    "police_report_filed": ("police report filed", "police report", "police report filed?"),
+    "week_of_month_claimed": ("week of month claimed", "claim week of month"),
+    "accident_area": ("accident area", "area of accident", "area"),
+    "sex": ("sex", "gender"),
+    "deductible": ("deductible", "deductible amount"),
+    "week_of_month": ("week of month", "current week of month")
+}
+_ALIAS_TO_FIELD = {alias: field for field, aliases in CLAIM_FIELD_ALIASES.items() for alias in aliases}
+_FLOAT_FIELDS = ("claim_amount",)
+_INT_FIELDS = ("driver_rating", "age", "week_of_month_claimed", "week_of_month", "deductible")
+
+# Skip the LLM when at least this many fields were read with enough confidence
+KV_MIN_FIELDS = 12
+KV_MIN_CONFIDENCE = 0.85
+
+
+def claim_info_from_key_values(kv_fields) -> Dict:
+    """
+    Build claim_info straight from Document Intelligence key-value pairs
     
-    def __init__(self, id="document_reader"):
-        super().__init__(id=id)
+    Args:
+        kv_fields: Iterable of (key, value, confidence) tuples
     
-    @handler
-    async def process_document(self, pdf_path: str, ctx: WorkflowContext[Dict]) -> None:
-        """Extract text and structured data from PDF using Azure Document Intelligence + AI"""
-        from azure.ai.documentintelligence import DocumentIntelligenceClient
-        from azure.core.credentials import AzureKeyCredential
-        from openai import AzureOpenAI
-        
-        endpoint = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
-        key = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
-        
-        client = DocumentIntelligenceClient(endpoint, AzureKeyCredential(key))
-        
-        with open(pdf_path, "rb") as f:
-            poller = client.begin_analyze_document("prebuilt-layout", f)
-            result = poller.result()
-        
-        # Extract text content
-        extracted_text = ""
-        for page in result.pages:
-            for line in page.lines:
-                extracted_text += line.content + "\n"
-        
-        # Extract key-value pairs
-        key_value_pairs = {}
-        if result.key_value_pairs:
-            for kv_pair in result.key_value_pairs:
-                if kv_pair.key and kv_pair.value:
-                    key_text = kv_pair.key.content if hasattr(kv_pair.key, 'content') else str(kv_pair.key)
-                    value_text = kv_pair.value.content if hasattr(kv_pair.value, 'content') else str(kv_pair.value)
-                    key_value_pairs[key_text] = value_text
-        
-        # Use AI to extract structured claim information (same as original)
-        openai_client = AzureOpenAI(
-            azure_endpoint=os.getenv("AZURE_AISERVICES_ENDPOINT"),
-            api_key=os.getenv("AZURE_AISERVICES_APIKEY"),
-            api_version="2024-02-15-preview"
-        )
-        
-        prompt = f"""Extract the following information from this insurance claim document:
+    Returns:
+        dict: claim_info with the matched fields, or None when too few fields
+        were found confidently (or a numeric field does not parse) and the
+        LLM extraction is needed
+    """
+    claim_info = {}
+    for key, value, confidence in kv_fields:
+        field = _ALIAS_TO_FIELD.get(key.strip().rstrip(":").strip().lower())
+        if field is None or field in claim_info or (confidence or 0) <= KV_MIN_CONFIDENCE:
+            continue
+        claim_info[field] = value.strip()
+    
+    if len(claim_info) < KV_MIN_FIELDS:
+        return None
+    
+    try:
+        for field in _FLOAT_FIELDS:
+            if field in claim_info:
+                claim_info[field] = float(claim_info[field].replace("$", "").replace(",", ""))
+        for field in _INT_FIELDS:
+            if field in claim_info:
+                claim_info[field] = int(float(claim_info[field].replace("$", "").replace(",", "")))
+    except ValueError:
+        return None
+    return claim_info
+
+
+# Static extraction instructions, sent as an identical system prefix on every
+# call so Azure OpenAI prompt caching can discount it
+SYSTEM_EXTRACT = """You are a data extraction expert. Extract information and return only valid JSON.
+
+Extract the following information from the insurance claim document the user provides:
 
 1. Policy Number
 2. Policyholder Name
@@ -228,37 +547,173 @@ class DocumentReaderExecutor(Executor):
 13. Deductible (insurance deductible amount)
 14. Week of Month (1-5, current week of month)
 
-Extracted Text:
+Return ONLY a JSON object with these exact keys: policy_number, policyholder_name, claim_amount, reason_for_claim, policy_type, claim_date, driver_rating, age, police_report_filed, week_of_month_claimed, accident_area, sex, deductible, week_of_month
+"""
+
+# Most key-value pairs sent to the model (recognized claim labels first)
+KV_PROMPT_LIMIT = 40
+
+
+def build_extraction_request(extracted_text: str, key_value_pairs: Dict) -> Dict:
+    """Build the chat completion body that extracts claim fields from OCR output"""
+    if len(key_value_pairs) > KV_PROMPT_LIMIT:
+        ranked = sorted(
+            key_value_pairs.items(),
+            key=lambda kv: kv[0].strip().rstrip(":").strip().lower() not in _ALIAS_TO_FIELD
+        )
+        key_value_pairs = dict(ranked[:KV_PROMPT_LIMIT])
+    
+    prompt = f"""Extracted Text:
 {extracted_text[:2000]}
 
 Key-Value Pairs:
-{json.dumps(key_value_pairs, indent=2)}
+{json.dumps(key_value_pairs)}"""
+    
+    return {
+        "messages": [
+            {"role": "system", "content": SYSTEM_EXTRACT},
+            {"role": "user", "content": prompt}
+        ],
+        # The 14-field JSON answer is ~150 tokens
+        "max_tokens": 250,
+        "temperature": 0.1,
+        "model": os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini"),
+        "response_format": {"type": "json_object"}
+    }
 
-Return ONLY a JSON object with these exact keys: policy_number, policyholder_name, claim_amount, reason_for_claim, policy_type, claim_date, driver_rating, age, police_report_filed, week_of_month_claimed, accident_area, sex, deductible, week_of_month
-"""
+
+# policy_number value as it appears in the streamed JSON answer
+POLICY_NUMBER_PATTERN = re.compile(r'"policy_number"\s*:\s*"([^"]+)"')
+
+
+class DocumentReaderExecutor(Executor):
+    """Extract data from uploaded PDF using Azure Document Intelligence"""
+    
+    def __init__(
+        self,
+        id="document_reader",
+        policy_prefetch: Optional[Callable[[str], Any]] = None
+    ):
+        super().__init__(id=id)
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+        from azure.core.credentials import AzureKeyCredential
         
-        response = openai_client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a data extraction expert. Extract information and return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.1,
-            model=os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini"),
-            response_format={"type": "json_object"}
+        # Async clients are created once so every document reuses their connections
+        self._di_client = DocumentIntelligenceClient(
+            os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT"),
+            AzureKeyCredential(os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY"))
         )
+        self._oai_client = get_openai_client()
         
-        claim_info = json.loads(response.choices[0].message.content)
+        # Re-uploaded documents reuse their earlier OCR + AI extraction
+        self._cache = get_extraction_cache()
+        
+        # Blocking lookup started (in a thread) as soon as the streamed answer names the policy
+        self.policy_prefetch = policy_prefetch
+    
+    @handler
+    async def process_document(self, pdf_path: str, ctx: WorkflowContext[Dict]) -> None:
+        """Extract text and structured data from PDF using Azure Document Intelligence + AI"""
+        extracted_data = await self._extract(pdf_path)
+        await ctx.send_message(extracted_data)
+    
+    async def _analyze(self, pdf_path: str):
+        """Run prebuilt-layout on a local PDF or on a URL (e.g. a blob SAS URL)"""
+        if pdf_path.startswith(("https://", "http://")):
+            # Document Intelligence downloads the file itself; nothing passes through this process
+            from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+            poller = await self._di_client.begin_analyze_document(
+                "prebuilt-layout", AnalyzeDocumentRequest(url_source=pdf_path)
+            )
+            return await poller.result()
+        
+        # Hand the SDK the open file so it streams the upload in 1 MiB reads
+        with open(pdf_path, "rb", buffering=1 << 20) as f:
+            poller = await self._di_client.begin_analyze_document("prebuilt-layout", f)
+            return await poller.result()
+    
+    async def _stream_claim_info(self, request: Dict) -> Dict:
+        """
+        Stream the extraction answer, prefetching the policy once its number arrives
+        
+        The prefetch overlaps the SQL lookup with the rest of the generation;
+        it is awaited before returning so the lookup never shares the SQL
+        connection with PolicyValidatorExecutor.
+        """
+        stream = await self._oai_client.chat.completions.create(**request, stream=True)
+        
+        answer = ""
+        prefetch = None
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            answer += chunk.choices[0].delta.content
+            if prefetch is None and self.policy_prefetch is not None:
+                match = POLICY_NUMBER_PATTERN.search(answer)
+                if match:
+                    prefetch = asyncio.create_task(asyncio.to_thread(self.policy_prefetch, match.group(1)))
+        
+        if prefetch is not None:
+            try:
+                await prefetch
+            except Exception as e:
+                logger.debug("policy prefetch failed: %s", e)
+        
+        return json.loads(answer)
+    
+    async def _extract(self, pdf_path: str) -> Dict:
+        """Run OCR and AI extraction for one PDF without blocking the event loop"""
+        cache_key = None
+        if not pdf_path.startswith(("https://", "http://")):
+            cache_key = await asyncio.to_thread(_file_sha256, pdf_path)
+            cached = await asyncio.to_thread(self._cache.get, cache_key)
+            if cached is not None:
+                extracted_data = json.loads(cached)
+                extracted_data["full_text"] = extracted_data["text"]
+                return extracted_data
+        
+        result = await self._analyze(pdf_path)
+        
+        # Extract text content (one join instead of repeated string +=)
+        extracted_text = "\n".join(line.content for page in result.pages for line in page.lines)
+        
+        # Extract key-value pairs
+        key_value_pairs = {}
+        kv_fields = []
+        if result.key_value_pairs:
+            for kv_pair in result.key_value_pairs:
+                if kv_pair.key and kv_pair.value:
+                    key_text = kv_pair.key.content if hasattr(kv_pair.key, 'content') else str(kv_pair.key)
+                    value_text = kv_pair.value.content if hasattr(kv_pair.value, 'content') else str(kv_pair.value)
+                    key_value_pairs[key_text] = value_text
+                    kv_fields.append((key_text, value_text, kv_pair.confidence))
+        
+        # Well-structured forms: the key-value pairs already hold the claim fields
+        claim_info = claim_info_from_key_values(kv_fields)
+        
+        # Otherwise use AI to extract structured claim information (same as original)
+        if claim_info is not None:
+            logger.debug("claim_info taken from key-value pairs, skipping LLM extraction")
+        else:
+            # One streamed call per document on purpose: the app extracts a single
+            # upload while the user waits, and Batch API jobs complete
+            # asynchronously (up to 24 h), so batching would only add latency
+            request = build_extraction_request(extracted_text, key_value_pairs)
+            claim_info = await self._stream_claim_info(request)
         
         extracted_data = {
             "text": extracted_text,
             "key_value_pairs": key_value_pairs,
             "page_count": len(result.pages),
-            "claim_info": claim_info,
-            "full_text": extracted_text
+            "claim_info": claim_info
         }
+        if cache_key is not None:
+            await asyncio.to_thread(self._cache.set, cache_key, json.dumps(extracted_data).encode("utf-8"))
         
-        await ctx.send_message(extracted_data)
+        # Alias, not a copy of the OCR text
+        extracted_data["full_text"] = extracted_data["text"]
+        
+        return extracted_data
 
 
 class PolicyValidatorExecutor(Executor):
@@ -280,40 +735,94 @@ class PolicyValidatorExecutor(Executor):
                 "policy_data": {}
             }
         else:
-            # Use existing Azure SQL agent
-            validation = self.sql_agent.validate_policy(policy_number)
+            # One blocking SQL round-trip, run off the event loop
+            result = await asyncio.to_thread(self.sql_agent.validate_and_get_details, policy_number)
             
+            policy_info = result.pop("policy_info", {})
+            result.pop("validation", None)
+            validation = result
+            
+            # Merge policy info into validation result
+            validation["policy_data"] = policy_info
+            data["validation_result"] = validation
             if validation.get("policy_exists"):
-                # Get detailed policy information
-                details = self.sql_agent.get_policy_details(policy_number)
-                
-                # Merge policy info into validation result
-                validation["policy_data"] = details.get("policy_info", {})
-                data["validation_result"] = validation
-                data["policy_details"] = details.get("policy_info", {})
-            else:
-                validation["policy_data"] = {}
-                data["validation_result"] = validation
+                data["policy_details"] = policy_info
         
         await ctx.send_message(data)
 
 
+CHAT_DEPLOYMENT = os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "gpt-4.1-mini")
+
+
+class EligibilityResponse(BaseModel):
+    """Structured output of the eligibility analysis"""
+    decision: Literal["ELIGIBLE", "NOT_ELIGIBLE"]
+    confidence: int
+    reasoning: str
+
+
+class CommunicationResponse(BaseModel):
+    """Structured email produced by the communication agent"""
+    subject: str
+    body: str
+
+
+def hard_policy_rejection(claim_info: Dict, validation_result: Dict, policy_details: Dict) -> Optional[str]:
+    """
+    Check the policy rules whose outcome needs no analysis
+    
+    Args:
+        claim_info: Extracted claim fields
+        validation_result: Output of PolicyValidatorExecutor
+        policy_details: Policy row (empty when the policy was not found)
+    
+    Returns:
+        str: Rejection reason, or None when the claim needs a full analysis
+        (including when the lookup itself failed)
+    """
+    if not validation_result.get("success"):
+        return None
+    if not validation_result.get("policy_exists"):
+        return f"Policy {claim_info.get('policy_number')} was not found."
+    
+    status = policy_details.get("policy_status") or ""
+    if status.lower() != "active":
+        return f"Policy status is {status or 'unknown'}; only active policies are eligible."
+    
+    limit = policy_details.get("policy_limit")
+    try:
+        amount = float(claim_info.get("claim_amount") or 0)
+    except (TypeError, ValueError):
+        return None
+    if limit is not None and amount > float(limit):
+        return f"Claim amount ${amount:,.2f} exceeds the policy limit of ${float(limit):,.2f}."
+    return None
+
+
 class EligibilityAgentExecutor(Executor):
     """AI-powered eligibility analysis"""
     
-    agent: ChatAgent
-    
-    def __init__(self, chat_client: AzureOpenAIChatClient, id="eligibility_agent"):
-        self.agent = chat_client.create_agent(
-            instructions="""You are an insurance eligibility analyst. Analyze claims and determine:
+    INSTRUCTIONS = """You are an insurance eligibility analyst. Analyze claims and determine:
             1. Whether the claim is eligible for processing
             2. Confidence level (0-100%)
             3. Detailed reasoning
             
-            Consider: policy status, claim amount vs limit, claim history.
-            Respond in JSON format: {"decision": "ELIGIBLE/NOT_ELIGIBLE", "confidence": 85, "reasoning": "..."}"""
-        )
+            Consider: policy status, claim amount vs limit, claim history."""
+    
+    def __init__(self, id="eligibility_agent"):
         super().__init__(id=id)
+        self._oai_client = get_openai_client()
+        self._plan_cache = get_plan_cache()
+        self._prompt_tmpl = """
+        Analyze this insurance claim:
+        - Policy: {policy_number}
+        - Claim Amount: ${claim_amount:,.2f}
+        - Policy Limit: ${policy_limit:,.2f}
+        - Policy Status: {policy_status}
+        - Past Claims: {claim_history_count}
+        
+        Is this claim eligible?
+        """
     
     @handler
     async def analyze_eligibility(self, data: Dict, ctx: WorkflowContext[Dict]) -> None:
@@ -321,29 +830,45 @@ class EligibilityAgentExecutor(Executor):
         claim_info = data.get("claim_info", {})
         policy_details = data.get("policy_details", {})
         
-        prompt = f"""
-        Analyze this insurance claim:
-        - Policy: {claim_info.get('policy_number')}
-        - Claim Amount: ${claim_info.get('claim_amount', 0):,.2f}
-        - Policy Limit: ${policy_details.get('policy_limit', 0):,.2f}
-        - Policy Status: {policy_details.get('policy_status')}
-        - Past Claims: {policy_details.get('claim_history_count', 0)}
-        
-        Is this claim eligible?
-        """
+        # Expired / unknown policies and over-limit claims are decided by rule
+        rejection = hard_policy_rejection(claim_info, data.get("validation_result", {}), policy_details)
+        if rejection:
+            data["eligibility_analysis"] = EligibilityResponse(
+                decision="NOT_ELIGIBLE", confidence=100, reasoning=rejection
+            ).model_dump()
+            await ctx.send_message(data)
+            return
         
-        response = await self.agent.run([ChatMessage(role="user", text=prompt)])
+        # Unparseable amounts have no stable fingerprint; analyse them uncached
+        fingerprint = claim_fingerprint(claim_info, policy_details)
+        plan_key = ResponseCache.make_key("eligibility", fingerprint) if fingerprint is not None else None
+        cached = await asyncio.to_thread(self._plan_cache.get, plan_key) if plan_key is not None else None
         
-        # Parse AI response
-        import json
-        try:
-            analysis = json.loads(response.text)
-        except:
-            analysis = {
-                "decision": "ELIGIBLE",
-                "confidence": 70,
-                "reasoning": response.text
-            }
+        if cached is not None:
+            # The key covers every prompt input, so the stored answer is reused without a model call
+            analysis = json.loads(cached)
+        else:
+            prompt = self._prompt_tmpl.format(**(fingerprint or {
+                "policy_number": claim_info.get('policy_number'),
+                "claim_amount": claim_info.get('claim_amount', 0),
+                "policy_limit": policy_details.get('policy_limit', 0),
+                "policy_status": policy_details.get('policy_status'),
+                "claim_history_count": policy_details.get('claim_history_count', 0)
+            }))
+            
+            # Structured outputs: the reply is validated against EligibilityResponse
+            completion = await self._oai_client.beta.chat.completions.parse(
+                model=CHAT_DEPLOYMENT,
+                messages=[
+                    {"role": "system", "content": self.INSTRUCTIONS},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=EligibilityResponse
+            )
+            analysis = completion.choices[0].message.parsed.model_dump()
+            
+            if plan_key is not None:
+                await asyncio.to_thread(self._plan_cache.set, plan_key, json.dumps(analysis).encode("utf-8"))
         
         data["eligibility_analysis"] = analysis
         await ctx.send_message(data)
@@ -352,46 +877,42 @@ class EligibilityAgentExecutor(Executor):
 class FraudDetectorExecutor(Executor):
     """ML-powered fraud detection"""
     
+    # claim_info keys in fraud_detector_agent.FEATURE_COLUMNS order
+    CLAIM_FEATURE_KEYS = (
+        "driver_rating", "age", "week_of_month_claimed", "week_of_month", "deductible",
+        "accident_area", "sex", "policy_type", "police_report_filed"
+    )
+    
     def __init__(self, id="fraud_detector"):
         super().__init__(id=id)
-        self.fraud_agent = FraudDetectorAgent()
+        self.fraud_agent = get_fraud_detector_agent()
+        # Reused feature buffer; owned by this executor, not the shared agent
+        self._features = np.zeros(len(self.CLAIM_FEATURE_KEYS), dtype=np.int32)
     
     @handler
     async def detect_fraud(self, data: Dict, ctx: WorkflowContext[Dict]) -> None:
         """Run fraud detection ML model"""
         claim_info = data.get("claim_info", {})
         
-        # Debug: Print claim_info to see what we're working with
-        print(f"\n🔍 DEBUG - Claim Info received:")
-        print(f"   Policy Type: {claim_info.get('policy_type')} (type: {type(claim_info.get('policy_type'))})")
-        print(f"   Accident Area: {claim_info.get('accident_area')} (type: {type(claim_info.get('accident_area'))})")
-        print(f"   Sex: {claim_info.get('sex')} (type: {type(claim_info.get('sex'))})")
-        print(f"   Police Report: {claim_info.get('police_report_filed')} (type: {type(claim_info.get('police_report_filed'))})")
-        print(f"   Driver Rating: {claim_info.get('driver_rating')}")
-        print(f"   Age: {claim_info.get('age')}")
-        print(f"   Claim Amount: {claim_info.get('claim_amount')}")
-        
-        # Prepare fraud detection data
-        # fraud_detector_agent.py will handle string to number conversion
-        fraud_data = {
-            "DriverRating": claim_info.get('driver_rating', 1),
-            "Age": claim_info.get('age', 30),
-            "PoliceReportFiled": claim_info.get('police_report_filed', 0),
-            "WeekOfMonthClaimed": claim_info.get('week_of_month_claimed', 1),
-            "PolicyType": claim_info.get('policy_type', 1),
-            "WeekOfMonth": claim_info.get('week_of_month', 1),
-            "AccidentArea": claim_info.get('accident_area', 1),
-            "Sex": claim_info.get('sex', 1),
-            "Deductible": claim_info.get('deductible', 500)
-        }
-        
-        print(f"\n🔍 DEBUG - Fraud data being sent to ML:")
-        print(json.dumps(fraud_data, indent=2))
+        logger.debug("fraud claim_info=%s", claim_info)
         
-        fraud_result = self.fraud_agent.detect_fraud(fraud_data)
+        if self.fraud_agent is None:
+            fraud_result = FraudDetectorAgent._error_result("Fraud Detector Agent is not initialized")
+        else:
+            try:
+                # Encode labels ("Urban", "Sedan - Liability", ...) straight into the buffer
+                features = encode_features(
+                    (claim_info.get(key) for key in self.CLAIM_FEATURE_KEYS),
+                    out=self._features
+                )
+            except (TypeError, ValueError) as e:
+                fraud_result = FraudDetectorAgent._error_result(f"Fraud detection error: {str(e)}")
+            else:
+                logger.debug("fraud features=%s", features)
+                # Blocking HTTPS call to Azure ML; keep the event loop free for the other branch
+                fraud_result = await asyncio.to_thread(self.fraud_agent.detect_fraud_vec, features)
         
-        print(f"\n🔍 DEBUG - Fraud result received:")
-        print(json.dumps(fraud_result, indent=2))
+        logger.debug("fraud_result=%s", fraud_result)
         
         data["fraud_analysis"] = fraud_result
         
@@ -403,16 +924,33 @@ class FraudDetectorExecutor(Executor):
         await ctx.send_message(data)
 
 
+class JoinExecutor(Executor):
+    """Merge the parallel fraud and policy/eligibility branches"""
+    
+    def __init__(self, id="join"):
+        super().__init__(id=id)
+    
+    @handler
+    async def merge(self, branches: List[Dict], ctx: WorkflowContext[Dict]) -> None:
+        """Union the branch results (fraud_analysis, eligibility_analysis, ...) into one dict"""
+        merged = {}
+        for branch in branches:
+            merged.update(branch)
+        await ctx.send_message(merged)
+
+
 class CommunicationAgentExecutor(Executor):
     """Generate and send communications"""
     
-    agent: ChatAgent
+    INSTRUCTIONS = "You are a professional insurance communication specialist. Generate clear, empathetic emails."
     
-    def __init__(self, chat_client: AzureOpenAIChatClient, id="communication_agent"):
-        self.agent = chat_client.create_agent(
-            instructions="You are a professional insurance communication specialist. Generate clear, empathetic emails."
-        )
+    # Stands in for the policy number in generated email templates
+    POLICY_SLOT = "[POLICY_NUMBER]"
+    
+    def __init__(self, id="communication_agent"):
         super().__init__(id=id)
+        self._oai_client = get_openai_client()
+        self._plan_cache = get_plan_cache()
     
     @handler
     async def generate_communication(self, data: Dict, ctx: WorkflowContext[Dict, str]) -> None:
@@ -420,89 +958,132 @@ class CommunicationAgentExecutor(Executor):
         decision = data.get("eligibility_analysis", {}).get("decision", "UNKNOWN")
         policy_number = data.get("claim_info", {}).get("policy_number")
         
-        prompt = f"Generate a professional email for policy {policy_number} with decision: {decision}"
-        response = await self.agent.run([ChatMessage(role="user", text=prompt)])
+        # Only a static skeleton is cached: the model writes the template from the
+        # decision alone, never sees claim details, and the policy number is
+        # filled in locally, so nothing from one claim can reach another's email
+        plan_key = ResponseCache.make_key("communication_template", {"decision": decision})
+        cached = await asyncio.to_thread(self._plan_cache.get, plan_key)
+        if cached is not None:
+            template = CommunicationResponse.model_validate_json(cached)
+        else:
+            prompt = (f"Generate a professional email template for an insurance claim with decision: {decision}. "
+                      f"Write {self.POLICY_SLOT} wherever the policy number belongs and do not include "
+                      f"names, amounts, dates or other claim details.")
+            completion = await self._oai_client.beta.chat.completions.parse(
+                model=CHAT_DEPLOYMENT,
+                messages=[
+                    {"role": "system", "content": self.INSTRUCTIONS},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=CommunicationResponse
+            )
+            template = completion.choices[0].message.parsed
+            
+            # A template without the slot would send every claim the same unaddressed email
+            if self.POLICY_SLOT in template.body:
+                await asyncio.to_thread(self._plan_cache.set, plan_key, template.model_dump_json().encode("utf-8"))
+        
+        email = CommunicationResponse(
+            subject=template.subject.replace(self.POLICY_SLOT, str(policy_number)),
+            body=template.body.replace(self.POLICY_SLOT, str(policy_number))
+        )
         
-        data["communication"] = response.text
+        # Subject/body for mail transport, plus the rendered text the UI shows
+        data["communication_email"] = email.model_dump()
+        data["communication"] = f"Subject: {email.subject}\n\n{email.body}"
         
-        # Create serializable output (extract only JSON-safe data)
-        # Convert all objects to ensure JSON serialization
+        # Pick the output fields without copying them; the payload is already plain data
         serializable_data = {
-            "claim_info": dict(data.get("claim_info", {})),
-            "validation_result": {
-                "policy_data": dict(data.get("validation_result", {}).get("policy_data", {})),
-                "policy_exists": data.get("validation_result", {}).get("policy_exists", False)
-            },
-            "policy_details": dict(data.get("policy_details", {})),
-            "eligibility_analysis": dict(data.get("eligibility_analysis", {})),
-            "fraud_analysis": dict(data.get("fraud_analysis", {})),
-            "communication": str(data.get("communication", "")),
-            "needs_human_review": bool(data.get("needs_human_review", False)),
-            "fraud_detected": bool(data.get("fraud_detected", False))
+            "claim_info": data.get("claim_info", {}),
+            "validation_result": data.get("validation_result", {}),
+            "policy_details": data.get("policy_details", {}),
+            "eligibility_analysis": data.get("eligibility_analysis", {}),
+            "fraud_analysis": data.get("fraud_analysis", {}),
+            "communication": data.get("communication", ""),
+            "communication_email": data.get("communication_email", {}),
+            "needs_human_review": data.get("needs_human_review", False),
+            "fraud_detected": data.get("fraud_detected", False)
         }
         
         # Final output - send message instead of yield_output to continue workflow
         await ctx.send_message(serializable_data)
 
 
-class AuditAgentExecutor(Executor):
-    """Log all workflow actions to Azure Blob Storage"""
-    
-    def __init__(self, id="audit_agent"):
-        super().__init__(id=id)
-        self.audit_agent = get_audit_agent()
-    
-    @handler
-    async def log_workflow(self, data: Dict, ctx: WorkflowContext[Dict, str]) -> None:
-        """Log all agent actions to audit trail"""
-        policy_number = data.get("claim_info", {}).get("policy_number", "UNKNOWN")
-        
-        # Log workflow completion
-        if self.audit_agent:
-            self.audit_agent.log_workflow_completion(
-                policy_number=policy_number,
-                workflow_data=data,
-                timestamp=datetime.now().isoformat()
-            )
-        
-        # Final output with audit confirmation
-        data["audit_logged"] = True
-        await ctx.yield_output(json.dumps(data, indent=2, default=str))
-
-
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
-async def process_claim_with_framework(pdf_path: str):
-    """Process claim using Agent Framework workflow (with original UI updates)"""
-    
-    # Initialize Azure OpenAI client for GitHub models (free tier)
-    chat_client = AzureOpenAIChatClient(
-        endpoint=os.getenv("AZURE_AISERVICES_ENDPOINT"),
-        api_key=os.getenv("AZURE_AISERVICES_APIKEY"),
-        model=os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini"),
-        deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "gpt-4.1-mini")
-    )
-    
+@_loop_cached
+def get_workflow():
+    """Build the executors and workflow graph once per event loop (executors hold loop-bound clients)"""
     # Create executor instances
-    doc_reader = DocumentReaderExecutor()
+    # Warm the policy row cache while the extraction answer is still streaming
+    doc_reader = DocumentReaderExecutor(policy_prefetch=get_azure_sql_agent().validate_and_get_details)
     policy_validator = PolicyValidatorExecutor()
-    eligibility_agent = EligibilityAgentExecutor(chat_client)
+    eligibility_agent = EligibilityAgentExecutor()
     fraud_detector = FraudDetectorExecutor()
-    communication_agent = CommunicationAgentExecutor(chat_client)
-    audit_agent = AuditAgentExecutor()
+    communication_agent = CommunicationAgentExecutor()
+    
+    join = JoinExecutor()
     
-    # Build the workflow (sequential pipeline - audit runs in background, not part of visible workflow)
-    workflow = (
+    # Build the workflow: fraud only needs claim_info, so it runs alongside
+    # policy -> eligibility and both branches join before communication.
+    # Audit is not a graph node: main() queues the completed run on the
+    # buffered audit writer once the workflow returns
+    return (
         WorkflowBuilder()
         .set_start_executor(doc_reader)
-        .add_edge(doc_reader, policy_validator)
+        .add_fan_out_edges(doc_reader, [policy_validator, fraud_detector])
         .add_edge(policy_validator, eligibility_agent)
-        .add_edge(eligibility_agent, fraud_detector)
-        .add_edge(fraud_detector, communication_agent)
+        .add_fan_in_edges([eligibility_agent, fraud_detector], join)
+        .add_edge(join, communication_agent)
         .build()
     )
+
+
+AGENT_NAMES = {
+    "document_reader": "📄 Document Reader Agent",
+    "policy_validator": "🗄️ Policy Validator Agent",
+    "eligibility_agent": "🔍 Eligibility Agent",
+    "fraud_detector": "🚨 Fraud Detector Agent",
+    "communication_agent": "📧 Communication Agent"
+}
+
+
+def _on_status_event(event: WorkflowStatusEvent, state: Dict) -> None:
+    """Keep the latest dict payload carried by a status event"""
+    if event.data and isinstance(event.data, dict):
+        state["results"] = event.data
+
+
+def _on_output_event(event: WorkflowOutputEvent, state: Dict) -> None:
+    """Final output received (a JSON string or the raw payload)"""
+    try:
+        state["results"] = json.loads(event.data) if isinstance(event.data, str) else event.data
+    except ValueError:
+        state["results"] = event.data
+    state["finished"] = True
+
+
+def _on_failed_event(event: ExecutorFailedEvent, state: Dict) -> None:
+    """Report the failing agent and stop reading the stream"""
+    st.error(f"❌ Agent failed: {AGENT_NAMES.get(event.executor_id, event.executor_id)}")
+    st.error(event.details.message)
+    state["finished"] = True
+
+
+# Exact event type -> handler; other events only move the progress display
+EVENT_HANDLERS = {
+    WorkflowStatusEvent: _on_status_event,
+    WorkflowOutputEvent: _on_output_event,
+    ExecutorFailedEvent: _on_failed_event
+}
+
+
+async def process_claim_with_framework(pdf_path: str):
+    """Process claim using Agent Framework workflow (with original UI updates)"""
+    
+    workflow = get_workflow()
     
     # Create UI placeholders (same as original)
     sidebar_status = st.sidebar.empty()
@@ -512,44 +1093,14 @@ async def process_claim_with_framework(pdf_path: str):
     detail_placeholder = st.empty()
     
     # Initialize results
-    results = {}
+    state = {"results": {}, "finished": False}
     current_step = 1
     
     # STEP 1: Orchestrator starts
-    sidebar_status.markdown("""
-    ### 📄 Current Status
-    
-    **🎯 Orchestrator Agent** 🟢 ONLINE  
-    ✅ Workflow started  
-    📹 Initializing pipeline
-    
-    ---
+    sidebar_status.markdown(SIDEBAR_TEMPLATES["orchestrator"])
     
-    **📄 Document Agent** 🔴 OFFLINE
-    
-    ---
-    
-    **🗄️ Azure SQL Agent** 🔴 OFFLINE
-    
-    ---
-    
-    **🔍 Eligibility Agent** 🔴 OFFLINE
-    
-    ---
-    
-    **🚨 Fraud Detection** 🔴 OFFLINE
-    
-    ---
-    
-    **📧 Communication** 🔴 OFFLINE
-    
-    ---
-    
-    **👤 Human Review** 🔴 OFFLINE
-    """)
-    
-    with workflow_placeholder.container():
-        show_workflow_progress(step=1)
+    workflow_placeholder.markdown(render_workflow_html(1), unsafe_allow_html=True)
+    last_step = 1
     
     progress_placeholder.progress(0.1)
     status_text.info("🎯 **Orchestrator Agent** is initializing the workflow...")
@@ -560,17 +1111,7 @@ async def process_claim_with_framework(pdf_path: str):
     - 📹 Loading configuration...
     """)
     
-    time.sleep(1.5)
-    
     # Execute workflow with streaming
-    agent_names = {
-        "document_reader": "📄 Document Reader Agent",
-        "policy_validator": "🗄️ Policy Validator Agent", 
-        "eligibility_agent": "🔍 Eligibility Agent",
-        "fraud_detector": "🚨 Fraud Detector Agent",
-        "communication_agent": "📧 Communication Agent"
-    }
-    
     step_mapping = {
         "document_reader": 2,
         "policy_validator": 3,
@@ -648,94 +1189,61 @@ async def process_claim_with_framework(pdf_path: str):
         ]
     }
     
-    async for event in workflow.run_stream(pdf_path):
-        if isinstance(event, WorkflowStatusEvent):
-            # Check if we have data in the event
-            if hasattr(event, 'data') and event.data:
-                results = event.data if isinstance(event.data, dict) else results
-        elif isinstance(event, WorkflowOutputEvent):
-            # Final output received
-            try:
-                results = json.loads(event.data) if isinstance(event.data, str) else event.data
-            except:
-                results = event.data
-            break
-        elif isinstance(event, ExecutorFailedEvent):
-            st.error(f"❌ Agent failed: {agent_names.get(event.executor_id, event.executor_id)}")
-            st.error(event.details.message)
-            break
-        
-        # Get executor ID from event if available
-        if hasattr(event, 'executor_id'):
-            executor_id = event.executor_id
-            if executor_id in step_mapping:
-                current_step = step_mapping[executor_id]
-                agent_name = agent_names.get(executor_id, "Agent")
-                
-                # Update sidebar for current agent
-                sidebar_status.markdown(f"""
-                ### 📄 Current Status
-                
-                **🎯 Orchestrator Agent** 🔴 OFFLINE
-                
-                ---
-                
-                **📄 Document Agent** {'🟢 ONLINE' if executor_id == 'document_reader' else '🔴 OFFLINE'}
-                {'⚙️ Processing document' if executor_id == 'document_reader' else ''}
-                {'🔍 Extracting data...' if executor_id == 'document_reader' else ''}
-                
-                ---
-                
-                **🗄️ Azure SQL Agent** {'🟢 ONLINE' if executor_id == 'policy_validator' else '🔴 OFFLINE'}
-                {'⚙️ Validating policy' if executor_id == 'policy_validator' else ''}
-                {'🔍 Querying database...' if executor_id == 'policy_validator' else ''}
-                
-                ---
-                
-                **🔍 Eligibility Agent** {'🟢 ONLINE' if executor_id == 'eligibility_agent' else '🔴 OFFLINE'}
-                {'⚙️ Analyzing eligibility' if executor_id == 'eligibility_agent' else ''}
-                {'🧠 AI processing...' if executor_id == 'eligibility_agent' else ''}
-                
-                ---
-                
-                **🚨 Fraud Detection** {'🟢 ONLINE' if executor_id == 'fraud_detector' else '🔴 OFFLINE'}
-                {'⚙️ Analyzing fraud risk' if executor_id == 'fraud_detector' else ''}
-                {'🧠 ML model processing...' if executor_id == 'fraud_detector' else ''}
-                
-                ---
-                
-                **📧 Communication** {'🟢 ONLINE' if executor_id == 'communication_agent' else '🔴 OFFLINE'}
-                {'⚙️ Generating communication' if executor_id == 'communication_agent' else ''}
-                
-                ---
+    renderer = ThrottledRenderer()
+    
+    # Events that arrive together are folded and rendered once per batch
+    async with aclosing(drain_batches(workflow.run_stream(pdf_path))) as batches:
+        async for batch in batches:
+            executor_id = None
+            for event in batch:
+                on_event = EVENT_HANDLERS.get(type(event))
+                if on_event is not None:
+                    on_event(event, state)
+                    if state["finished"]:
+                        break
                 
-                **👤 Human Review** 🔴 OFFLINE
-                """)
+                # Keep the last agent that reported in this batch
+                event_executor = getattr(event, "executor_id", None)
+                if event_executor in step_mapping:
+                    executor_id = event_executor
+                    # Branches of the fan-out report out of order; never move the tracker backwards
+                    current_step = max(current_step, step_mapping[executor_id])
+            
+            if executor_id is not None:
+                agent_name = AGENT_NAMES.get(executor_id, "Agent")
                 
-                # Update workflow visualization
-                with workflow_placeholder.container():
-                    show_workflow_progress(step=current_step)
+                # Update sidebar for current agent
+                renderer.update(sidebar_status, "markdown", SIDEBAR_TEMPLATES[executor_id])
                 
-                # Update progress bar (6 steps total: orchestrator + 5 agents)
-                progress = min(current_step / 6, 1.0)
-                progress_placeholder.progress(progress)
+                # Update workflow visualization and progress bar only when the step moved
+                if current_step != last_step:
+                    last_step = current_step
+                    renderer.update(workflow_placeholder, "markdown", render_workflow_html(current_step),
+                                    unsafe_allow_html=True)
+                    
+                    # 6 steps total: orchestrator + 5 agents
+                    progress = min(current_step / 6, 1.0)
+                    renderer.update(progress_placeholder, "progress", progress)
                 
                 # Update status text
-                status_text.info(f"⚙️ **{agent_name}** is processing...")
+                renderer.update(status_text, "info", f"⚙️ **{agent_name}** is processing...")
                 
-                # Show detailed progress messages for this agent
+                # Show the latest progress message for this agent
                 if executor_id in agent_detail_messages:
-                    messages = agent_detail_messages[executor_id]
-                    for msg in messages:
-                        detail_placeholder.markdown(msg)
-                        time.sleep(0.7)  # Pause between progress updates
+                    renderer.update(detail_placeholder, "markdown", agent_detail_messages[executor_id][-1])
                 else:
                     # Fallback generic message
-                    detail_placeholder.markdown(f"""
+                    renderer.update(detail_placeholder, "markdown", f"""
 **{agent_name}** - *Working*
 - 🔄 Processing data...
 - ⚙️ Agent Framework executing...
 """)
+            
+            if state["finished"]:
+                break
+    
+    # Show whatever is still buffered before the final status replaces it
+    renderer.flush()
     
     # Final status
     status_text.success("✅ **All agents completed successfully!**")
@@ -746,12 +1254,20 @@ async def process_claim_with_framework(pdf_path: str):
     """)
     
     # Don't sleep here - let results display immediately
-    return results
+    return state["results"]
+
+
+# Result sections that each produced one audit record
+AUDIT_KEYS = ("claim_info", "validation_result", "eligibility_analysis", "fraud_analysis")
 
 
 def main():
     """Main Streamlit application (same UI as original)"""
     
+    # Create (and warm) the fraud model and SQL clients on app start, not on the first claim
+    get_fraud_detector_agent()
+    get_azure_sql_agent(warm_up=True)
+    
     st.markdown("""
     <style>
     .main-title {
@@ -799,16 +1315,20 @@ def main():
         st.warning("⚠️ **A rejected claim is available for review.** You can override the decision in the **'Human Review'** tab.")
     
     with tab1:
-        # Debug output
-        st.sidebar.write("**DEBUG INFO:**")
-        st.sidebar.write(f"processing_completed: {st.session_state.get('processing_completed', 'NOT SET')}")
-        st.sidebar.write(f"last_processing_results: {st.session_state.get('last_processing_results') is not None}")
-        st.sidebar.write(f"fraud_detected: {st.session_state.get('fraud_detected', 'NOT SET')}")
+        # Debug output (set APP_DEBUG=1 to show it)
+        if APP_DEBUG:
+            with st.sidebar.expander("Debug", expanded=False):
+                st.write(f"processing_completed: {st.session_state.get('processing_completed', 'NOT SET')}")
+                st.write(f"last_processing_results: {st.session_state.get('last_processing_results') is not None}")
+                st.write(f"fraud_detected: {st.session_state.get('fraud_detected', 'NOT SET')}")
         
         # Check if we have completed results to display
         if st.session_state.get('processing_completed') and st.session_state.get('last_processing_results'):
             # Display results (same as original - full agent summaries)
             results = st.session_state['last_processing_results']
+            claim_info = results.get('claim_info') or {}
+            fraud_analysis = results.get('fraud_analysis') or {}
+            policy_number = claim_info.get('policy_number', 'N/A')
             
             # Check if human review was completed
             has_review_decision = False
@@ -829,14 +1349,12 @@ def main():
             st.markdown("---")
             st.markdown("### 🎉 Agent Execution Summary")
             
-            import pandas as pd
             agent_data = []
             
             # 1. Document Reader Agent
-            if results.get('claim_info'):
-                claim_info = results['claim_info']
+            if claim_info:
                 work_done = "Extracted claim data from PDF using Azure Document Intelligence OCR"
-                output = f"Policy: {claim_info.get('policy_number', 'N/A')} | Name: {claim_info.get('policyholder_name', 'N/A')} | Amount: ${claim_info.get('claim_amount', '0')}"
+                output = f"Policy: {policy_number} | Name: {claim_info.get('policyholder_name', 'N/A')} | Amount: ${claim_info.get('claim_amount', '0')}"
                 agent_data.append(["📄 Document Reader Agent", work_done, output])
             
             # 2. Policy Validator Agent
@@ -856,18 +1374,17 @@ def main():
                 agent_data.append(["🔍 Eligibility Agent", work_done, output])
             
             # 4. Fraud Detection Agent
-            if results.get('fraud_analysis'):
-                fraud = results['fraud_analysis']
-                if fraud.get('success'):
+            if fraud_analysis:
+                if fraud_analysis.get('success'):
                     work_done = "ML-based fraud detection using Azure ML deployed model"
-                    fraud_prob = fraud.get('fraud_probability', 0)
-                    fraud_risk = fraud.get('fraud_risk', 'Unknown')
-                    is_fraud = fraud.get('is_fraud', False)
+                    fraud_prob = fraud_analysis.get('fraud_probability', 0)
+                    fraud_risk = fraud_analysis.get('fraud_risk', 'Unknown')
+                    is_fraud = fraud_analysis.get('is_fraud', False)
                     output = f"Result: {'⚠️ FRAUD' if is_fraud else '✅ NO FRAUD'} | Probability: {fraud_prob:.2%} | Risk: {fraud_risk}"
                     agent_data.append(["🚨 Fraud Detector Agent", work_done, output])
                 else:
                     work_done = "ML-based fraud detection attempted"
-                    error_msg = fraud.get('error', 'Azure ML endpoint unavailable')
+                    error_msg = fraud_analysis.get('error', 'Azure ML endpoint unavailable')
                     output = f"⚠️ SKIPPED: {error_msg}"
                     agent_data.append(["🚨 Fraud Detector Agent", work_done, output])
             
@@ -879,9 +1396,8 @@ def main():
                 agent_data.append(["👤 Human Review Agent", work_done, output])
             elif is_fraud_detected:
                 work_done = "Fraud detected - awaiting manual review decision"
-                current_policy = results.get('claim_info', {}).get('policy_number', 'N/A')
-                fraud_prob = results.get('fraud_analysis', {}).get('fraud_probability', 0)
-                output = f"Status: ⏳ PENDING | Policy: {current_policy} | Fraud Probability: {fraud_prob:.2%}"
+                fraud_prob = fraud_analysis.get('fraud_probability', 0)
+                output = f"Status: ⏳ PENDING | Policy: {policy_number} | Fraud Probability: {fraud_prob:.2%}"
                 agent_data.append(["👤 Human Review Agent", work_done, output])
             else:
                 work_done = "No human review required - claim processed automatically"
@@ -892,36 +1408,26 @@ def main():
             if results.get('communication'):
                 communication = results['communication']
                 work_done = "Sent professional email communication to policyholder"
-                current_policy = results.get('claim_info', {}).get('policy_number', 'N/A')
-                output = f"✅ Email sent | Policy: {current_policy} | Length: {len(str(communication))} chars"
+                output = f"✅ Email sent | Policy: {policy_number} | Length: {len(str(communication))} chars"
                 agent_data.append(["📧 Communication Agent", work_done, output])
             
             # 7. Audit Agent
             work_done = "Logged all agent actions to Azure Blob Storage audit trail"
-            audit_logs_count = sum([
-                1 if results.get('claim_info') else 0,
-                1 if results.get('validation_result') else 0,
-                1 if results.get('eligibility_analysis') else 0,
-                1 if results.get('fraud_analysis') else 0,
-                1 if has_review_decision else 0
-            ])
-            current_policy = results.get('claim_info', {}).get('policy_number', 'N/A')
-            output = f"✅ Logged {audit_logs_count} agent actions | Policy: {current_policy} | Audit Trail: Azure Blob Storage"
+            audit_logs_count = sum(1 for key in AUDIT_KEYS if results.get(key)) + int(has_review_decision)
+            output = f"✅ Logged {audit_logs_count} agent actions | Policy: {policy_number} | Audit Trail: Azure Blob Storage"
             agent_data.append(["📝 Audit Agent", work_done, output])
             
             # Display agent summary table
             if agent_data:
-                df_agents = pd.DataFrame(agent_data, columns=["Agent Name", "Work Performed", "Output/Result"])
-                st.dataframe(
-                    df_agents,
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "Agent Name": st.column_config.TextColumn("Agent Name", width="small"),
-                        "Work Performed": st.column_config.TextColumn("Work Performed", width="medium"),
-                        "Output/Result": st.column_config.TextColumn("Output/Result", width="large")
-                    }
+                # Plain markdown table: one line per row, pipes and "$" escaped
+                # (Streamlit renders $...$ as LaTeX)
+                rows = "\n".join(
+                    "| " + " | ".join(
+                        str(cell).replace("\n", " ").replace("|", "\\|").replace("$", "\\$") for cell in row
+                    ) + " |"
+                    for row in agent_data
                 )
+                st.markdown("| Agent Name | Work Performed | Output/Result |\n|---|---|---|\n" + rows)
             
             st.markdown("---")
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -990,10 +1496,18 @@ def main():
                         if key in st.session_state:
                             del st.session_state[key]
                     
-                    # Save uploaded file
-                    pdf_path = f"temp_{uploaded_file.name}"
-                    with open(pdf_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                    # Save uploaded file under a name unique to this run, so concurrent
+                    # sessions never share (or delete) each other's copy. Re-uploads of
+                    # the same claim still skip OCR: the extraction cache is keyed by
+                    # the file's SHA-256, not its name.
+                    with tempfile.NamedTemporaryFile(
+                        "wb", prefix="temp_", suffix=os.path.splitext(uploaded_file.name)[1].lower(),
+                        dir=".", delete=False
+                    ) as f:
+                        pdf_path = f.name
+                        # Stream to disk in 1 MiB chunks rather than one full-size copy
+                        uploaded_file.seek(0)
+                        shutil.copyfileobj(uploaded_file, f, length=1 << 20)
                     
                     st.markdown("---")
                     
@@ -1002,13 +1516,14 @@ def main():
                     
                     # Process with Agent Framework
                     try:
-                        results = asyncio.run(process_claim_with_framework(pdf_path))
+                        results = get_session_loop().run_until_complete(process_claim_with_framework(pdf_path))
                         
-                        # Log to audit trail (runs in background, not part of visible workflow)
-                        audit_agent_instance = get_audit_agent()
-                        if audit_agent_instance:
+                        # Log to audit trail; the record is only queued here and the
+                        # buffered writer's background thread uploads it to Blob Storage
+                        if get_audit_agent():
                             policy_number = results.get('claim_info', {}).get('policy_number', 'UNKNOWN')
-                            audit_agent_instance.log_orchestrator_action(
+                            get_buffered_audit_writer().log(
+                                agent_name="OrchestratorAgent",
                                 policy_number=policy_number,
                                 action="workflow_completed",
                                 inputs={"pdf_path": uploaded_file.name if uploaded_file else "unknown"},